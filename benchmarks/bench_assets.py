@@ -0,0 +1,75 @@
+"""素材下載：逐一 requests.get vs 連線池平行下載 vs 磁碟快取 (含離線)。
+
+以本機 http.server 代替 GitHub，每個請求加上固定延遲模擬網路往返 (不需對外網路)。
+執行：python benchmarks/bench_assets.py [--latency 0.08]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.assets import fetch, prefetch
+from shared.ballpark import ASSET_VER, IMAGES
+
+PAYLOAD = os.urandom(200 * 1024)
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = 0
+
+    def do_GET(self):
+        Handler.requests += 1
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t) * 1e3, out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.08, help='每個請求的模擬延遲 (秒)')
+    args = parser.parse_args()
+    Handler.latency = args.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    # 與 ballpark 相同的素材清單，只換掉主機
+    urls = [url.replace("https://raw.githubusercontent.com", base) for url in IMAGES.values()]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        t_serial, _ = timed(lambda: [requests.get(u, timeout=20).content for u in urls])
+        t_cold, cold = timed(lambda: prefetch(urls, ASSET_VER, cache_dir=cache_dir))
+        before = Handler.requests
+        t_warm, _ = timed(lambda: prefetch(urls, ASSET_VER, cache_dir=cache_dir))
+        warm_requests = Handler.requests - before
+
+        server.shutdown()
+        server.server_close()
+        t_offline, offline = timed(lambda: [fetch(u, ASSET_VER, max_age=0, cache_dir=cache_dir) for u in urls])
+
+    assert all(not isinstance(r, Exception) for r in cold.values())
+    assert all(r.from_cache and r.content == PAYLOAD for r in offline)
+    print(f"{len(urls)} assets x {len(PAYLOAD) // 1024} KB, latency {args.latency * 1e3:.0f} ms")
+    print(f"{'':<26}{'ms':>10}")
+    print(f"{'serial requests.get':<26}{t_serial:>10.0f}")
+    print(f"{'prefetch (cold)':<26}{t_cold:>10.0f}")
+    print(f"{'prefetch (disk cache)':<26}{t_warm:>10.1f}   requests: {warm_requests}")
+    print(f"{'offline (stale cache)':<26}{t_offline:>10.1f}")
@@ -0,0 +1,101 @@
+"""像素棒球場每次點擊的伺服器端繪製時間：舊版 build_map vs 預先合成的 atlas 畫面。
+
+以合成的假素材代替 GitHub 圖檔 (不需網路)；兩者都量到 streamlit_image_coordinates 產生 data URL 為止。
+另外比較 HitMap 與舊的矩形掃描的點擊判定速度 (判定正確性見 tests/test_ballpark.py)。
+執行：python benchmarks/bench_ballpark.py
+"""
+import base64
+import os
+import sys
+import time
+import zlib
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.ballpark import FIELD_H, FIELD_W, IMAGES, PLACEMENTS, build_atlas, build_field_states
+
+SOURCES = {}
+
+
+def fake_fetch(url):
+    # 原始素材尺寸：背景 1600x1200、sprite 512x512 (帶透明邊)
+    if url not in SOURCES:
+        rng = np.random.default_rng(zlib.crc32(url.encode()))
+        size = (1200, 1600) if url == IMAGES["BG"] else (512, 512)
+        px = rng.integers(0, 255, size=(*size, 4), dtype=np.uint8)
+        if url != IMAGES["BG"]:
+            px[:64], px[-64:], px[:, :64], px[:, -64:] = 0, 0, 0, 0
+        else:
+            px[..., 3] = 255
+        SOURCES[url] = Image.fromarray(px, "RGBA")
+    return SOURCES[url].copy()
+
+
+# 舊版：每次點擊都重新縮放、合成整張球場 (fetch_image 有 st.cache_data，這裡同樣只算取出快取的成本)
+def legacy_build_map(selected_role):
+    bg = fake_fetch(IMAGES["BG"]).resize((FIELD_W, FIELD_H))
+    regions = {}
+    for role, p in PLACEMENTS.items():
+        scale = 1.3 if role == selected_role else 1.0
+        w, h = int(p["w"] * scale), int(p["h"] * scale)
+        sprite = fake_fetch(IMAGES[role]).resize((w, h))
+        x, y = int(p["left"] * FIELD_W), int(p["top"] * FIELD_H)
+        bg.alpha_composite(sprite, (x, y))
+        regions[role] = (x, y, x + w, y + h)
+    return bg, regions
+
+
+# 舊版點擊判定：依 dict 順序掃描矩形，第一個命中者勝出
+def legacy_detect_role(x, y, regions):
+    for role, (x1, y1, x2, y2) in regions.items():
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            return role
+    return None
+
+
+def to_data_url(image):
+    # 與 streamlit_image_coordinates 傳入 PIL 物件時相同 (PNG, compress_level=0)
+    buf = BytesIO()
+    image.save(buf, format="PNG", compress_level=0)
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t)
+    return np.median(samples) * 1e3, out
+
+
+if __name__ == '__main__':
+    roles = [None, *PLACEMENTS]
+    for url in IMAGES.values():
+        fake_fetch(url)
+
+    t_legacy, url_legacy = timed(lambda: [to_data_url(legacy_build_map(r)[0]) for r in roles], repeat=3)
+
+    t = time.perf_counter()
+    atlas, rects = build_atlas(fake_fetch)
+    states = build_field_states(atlas, rects)
+    t_startup = (time.perf_counter() - t) * 1e3
+    t_cached, url_cached = timed(lambda: [to_data_url(states[r][0]) for r in roles])
+
+    n = len(roles)
+    print(f"startup (atlas + {n} field states): {t_startup:.0f} ms, atlas {atlas.size[0]}x{atlas.size[1]}")
+    print(f"{'per click':<20}{'ms':>10}{'payload (KB)':>16}")
+    print(f"{'legacy build_map':<20}{t_legacy / n:>10.2f}{len(url_legacy[0]) / 1024:>16.0f}")
+    print(f"{'cached state':<20}{t_cached / n:>10.2f}{len(url_cached[0]) / 1024:>16.0f}")
+
+    regions = legacy_build_map(None)[1]
+    hit_map = states[None][1]
+    clicks = [(int(x), int(y)) for x, y in np.random.default_rng(1).integers(0, FIELD_H, (10000, 2))]
+    t_rect, _ = timed(lambda: [legacy_detect_role(x, y, regions) for x, y in clicks], repeat=5)
+    t_mask, _ = timed(lambda: [hit_map.role_at(x, y) for x, y in clicks], repeat=5)
+    print(f"{'per hit test':<20}{'us':>10}")
+    print(f"{'legacy rect scan':<20}{t_rect / len(clicks) * 1e3:>10.2f}")
+    print(f"{'HitMap':<20}{t_mask / len(clicks) * 1e3:>10.2f}")
@@ -0,0 +1,75 @@
+"""球員卡牌頁：候選名單從 4 人放大到數千人時，開啟頁面的伺服器端成本。
+
+舊版每張卡都建一張雷達圖；新版只建名單 (一次) 與當頁 4 張卡的圖。
+名單以真實資料複製並改名放大到指定人數。
+執行：python benchmarks/bench_cards.py [--players 4 1000 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import load_batters, load_pitchers
+from shared.players import PlayerIndex, build_roster, search_roster
+
+CARDS_PER_PAGE = 4
+
+
+def scale_pool(df_bat, df_pit, n_players):
+    # 依名字複製整位球員的生涯 (打者、投手一起)，直到名單人數達到 n_players
+    names = pd.unique(pd.concat([df_bat['Name'], df_pit['Name']]).astype(str))
+    out = []
+    for df in (df_bat, df_pit):
+        copies = []
+        for k in range(-(-n_players // len(names))):
+            take = names[:min(len(names), n_players - k * len(names))]
+            part = df[df['Name'].astype(str).isin(take)]
+            copies.append(part.assign(Name=part['Name'].astype(str) + (f"#{k}" if k else "")))
+        out.append(pd.concat(copies, ignore_index=True))
+    return out
+
+
+def radar(row):
+    # 與頁面相同的圖表結構 (一條 Scatterpolar + polar layout)
+    values = [row['AVG'], row['OPS'], row['HR'], row['RBI'], row['SB']]
+    fig = go.Figure(go.Scatterpolar(r=values, theta=['打擊率', 'OPS', '全壘打', '打點', '盜壘'], fill='toself',
+                                    text=[f"{v:.2f}" for v in values]))
+    fig.update_layout(polar=dict(radialaxis=dict(range=[0, 100])), showlegend=False, height=300)
+    return fig.to_dict()
+
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t) * 1e3, out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, nargs='+', default=[4, 1000, 5000])
+    args = parser.parse_args()
+
+    df_bat, df_pit = load_batters(), load_pitchers()
+    t_fig, _ = timed(lambda: [radar(r) for _, r in df_bat.head(20).iterrows()])
+    per_fig = t_fig / 20
+
+    print(f"radar figure: {per_fig:.1f} ms each")
+    print(f"{'players':>8}{'rows':>8}{'eager (ms)':>14}{'roster (ms)':>14}{'search (ms)':>14}{'page (ms)':>12}")
+    for n in args.players:
+        bat, pit = scale_pool(df_bat, df_pit, n)
+        bat_index = PlayerIndex(bat)
+        t_roster, roster = timed(lambda: build_roster(bat, pit))
+        t_search, _ = timed(lambda: search_roster(roster, "林"))
+
+        def one_page():
+            cards = roster[~roster['is_pitcher']].head(CARDS_PER_PAGE)
+            return [radar(bat_index.latest(c.Name, [int(c.Year)])) for c in cards.itertuples()]
+
+        t_page, _ = timed(one_page)
+        # 舊版作法：名單上每位球員都建一張圖 (以量到的單張成本推估)
+        eager = len(roster) * per_fig
+        print(f"{len(roster):>8}{len(bat) + len(pit):>8}{eager:>14.0f}{t_roster:>14.1f}{t_search:>14.1f}{t_page:>12.1f}")
@@ -0,0 +1,107 @@
+"""數據儀表板：拖動「最少打席數」slider 時，每次互動花掉的伺服器 CPU 時間。
+
+啟動真的 streamlit server，以 websocket 模擬瀏覽器：先開啟頁面，再連續送出 slider 變動。
+full 模式不帶 fragment id (整頁重跑，舊版頁面只有這種)；fragment 模式只重跑 slider 所在的分頁。
+CPU 時間取自 server process 的 /proc/<pid>/stat (utime + stime)。
+執行：python benchmarks/bench_dashboard.py [--page 其他版本的頁面.py] [--clicks 20]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "pages", "1_📊_數據儀表板.py")
+SLIDER_KEY = "t2_slider"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit server 啟動失敗")
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def rerun(ws, slider=None, fragment_id=""):
+    msg = BackMsg()
+    if slider is not None:
+        widget_id, value = slider
+        state = msg.rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        state.double_array_value.data.append(value)
+    msg.rerun_script.fragment_id = fragment_id
+    await ws.send(msg.SerializeToString())
+
+    found = None
+    while True:
+        fwd = ForwardMsg()
+        fwd.ParseFromString(await ws.recv())
+        kind = fwd.WhichOneof("type")
+        if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+            element = fwd.delta.new_element
+            if element.WhichOneof("type") == "slider" and element.slider.id.endswith(SLIDER_KEY):
+                found = element.slider.id, fwd.delta.fragment_id
+        elif kind == "script_finished":
+            return found
+
+
+async def run(port, pid, mode, clicks):
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                                  max_size=None) as ws:
+        slider_id, fragment_id = await rerun(ws)  # 開啟頁面
+        if mode == "full":
+            fragment_id = ""
+        t, cpu = time.perf_counter(), cpu_seconds(pid)
+        for i in range(clicks):
+            # 每次都是新的打席門檻，快取不會直接命中
+            await rerun(ws, (slider_id, 60 + i * 7), fragment_id)
+        return (cpu_seconds(pid) - cpu) / clicks * 1e3, (time.perf_counter() - t) / clicks * 1e3, bool(fragment_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--page', default=PAGE)
+    parser.add_argument('--clicks', type=int, default=20)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_server(os.path.abspath(args.page), port)
+    try:
+        print(f"{'mode':<10}{'cpu ms/click':>14}{'wall ms/click':>15}")
+        for mode in ("full", "fragment"):
+            cpu, wall, isolated = asyncio.run(run(port, proc.pid, mode, args.clicks))
+            if mode == "fragment" and not isolated:
+                print(f"{mode:<10}{'(slider 不在 fragment 內)':>29}")
+                continue
+            print(f"{mode:<10}{cpu:>14.1f}{wall:>15.1f}")
+    finally:
+        proc.terminate()
+        proc.wait()
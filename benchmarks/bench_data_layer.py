@@ -0,0 +1,94 @@
+"""舊版各頁面 load_data() 與 shared.data 的冷啟動時間 / 記憶體比較。
+
+執行：python benchmarks/bench_data_layer.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.cache import load_cached
+from shared.data import RAW_DATA_PATH, TARGET_TEAMS, TEAM_NAME_MAP, build_tables
+
+
+# 舊版：數據儀表板
+def legacy_dashboard():
+    df = pd.read_csv(RAW_DATA_PATH)
+    for col in ['bat_PA', 'pit_IP', 'pit_ER', 'pit_BB', 'pit_H', 'pit_SO']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    bat_cols = ['Name_clean', 'Team Name_x', 'Year', 'bat_PA', 'bat_AB', 'bat_H', 'bat_HR', 'bat_SB', 'bat_AVG', 'bat_OPS', 'bat_OBP', 'bat_SLG']
+    df_bat = df[bat_cols].sort_values(by=['Year', 'bat_PA'], ascending=[False, False])
+    df_bat = df_bat.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df_bat = df_bat.rename(columns={'Name_clean': 'Name', 'Team Name_x': 'Team', 'bat_PA': 'PA'})
+    df_bat['Team'] = df_bat['Team'].replace(TEAM_NAME_MAP)
+    df_bat = df_bat[df_bat['Team'].isin(TARGET_TEAMS) & (df_bat['PA'] > 0)]
+
+    df_pit = df[(df['pit_IP'] > 0) & (df['bat_PA'] < 10)].copy()
+    df_pit['pit_ERA'] = (df_pit['pit_ER'] * 9) / df_pit['pit_IP'].replace(0, 0.1)
+    df_pit['pit_WHIP'] = (df_pit['pit_BB'] + df_pit['pit_H']) / df_pit['pit_IP'].replace(0, 0.1)
+    df_pit = df_pit[['Name_clean', 'Team Name_y', 'Year', 'pit_ERA', 'pit_IP', 'pit_SO', 'pit_BB', 'pit_WHIP']]
+    df_pit = df_pit.sort_values(by=['Year', 'pit_IP'], ascending=[False, False])
+    df_pit = df_pit.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df_pit = df_pit.rename(columns={'Name_clean': 'Name', 'Team Name_y': 'Team'})
+    df_pit['Team'] = df_pit['Team'].fillna('Unknown').replace(TEAM_NAME_MAP)
+    return df_bat, df_pit[df_pit['Team'].isin(TARGET_TEAMS)]
+
+
+# 舊版：深度論壇
+def legacy_forum():
+    df = pd.read_csv(RAW_DATA_PATH)
+    for c in ['bat_PA', 'bat_AB', 'bat_R', 'bat_H', 'bat_2B', 'bat_3B', 'bat_HR', 'bat_SF', 'bat_SH', 'bat_BB',
+              'bat_IBB', 'bat_HBP', 'bat_SO', 'bat_SB', 'bat_CS', 'bat_GIDP', 'bat_AVG', 'bat_OPS']:
+        df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+    df['bat_1B'] = df['bat_H'] - df['bat_2B'] - df['bat_3B'] - df['bat_HR']
+    cols = ['Name_clean', 'Team Name_x', 'Year', 'bat_PA', 'bat_AB', 'bat_R', 'bat_H', 'bat_1B', 'bat_BB',
+            'bat_HBP', 'bat_IBB', 'bat_SF', 'bat_AVG', 'bat_OPS', 'bat_SB', 'bat_CS']
+    df_bat = df[cols].sort_values(by=['Year', 'bat_PA'], ascending=[False, False])
+    df_bat = df_bat.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df_bat = df_bat.rename(columns={'Name_clean': 'Name', 'Team Name_x': 'Team', 'bat_PA': 'PA'})
+    df_bat['Team'] = df_bat['Team'].replace(TEAM_NAME_MAP)
+    return df_bat[df_bat['Team'].isin(TARGET_TEAMS) & (df_bat['PA'] > 0)]
+
+
+# 舊版：球員卡牌（原本從 GitHub 讀同一份 CSV，這裡改讀本機檔以排除網路因素）
+def legacy_cards():
+    df = pd.read_csv(RAW_DATA_PATH)
+    for c in ['bat_AVG', 'bat_OPS', 'bat_HR', 'bat_SB', 'bat_RBI', 'pit_ERA', 'pit_W', 'pit_SO', 'pit_WHIP', 'pit_IP']:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+    return df
+
+
+def mem_mb(*frames):
+    return sum(f.memory_usage(deep=True).sum() for f in frames) / 1024 ** 2
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+if __name__ == '__main__':
+    t_dash, (bat_a, pit_a) = timed(legacy_dashboard)
+    t_forum, bat_b = timed(legacy_forum)
+    t_cards, raw_c = timed(legacy_cards)
+    t_shared, (bat, pit) = timed(build_tables)
+    load_cached(('batters', 'pitchers'), RAW_DATA_PATH, build_tables)
+    t_disk, _ = timed(lambda: load_cached(('batters', 'pitchers'), RAW_DATA_PATH, build_tables))
+
+    print(f"{'loader':<24}{'cold start (ms)':>18}{'cached (MB)':>14}")
+    print(f"{'legacy dashboard':<24}{t_dash * 1e3:>18.1f}{mem_mb(bat_a, pit_a):>14.2f}")
+    print(f"{'legacy forum':<24}{t_forum * 1e3:>18.1f}{mem_mb(bat_b):>14.2f}")
+    print(f"{'legacy cards':<24}{t_cards * 1e3:>18.1f}{mem_mb(raw_c):>14.2f}")
+    legacy_t = t_dash + t_forum + t_cards
+    legacy_m = mem_mb(bat_a, pit_a, bat_b, raw_c)
+    print(f"{'legacy total':<24}{legacy_t * 1e3:>18.1f}{legacy_m:>14.2f}")
+    print(f"{'shared.data':<24}{t_shared * 1e3:>18.1f}{mem_mb(bat, pit):>14.2f}")
+    print(f"{'shared.data (parquet)':<24}{t_disk * 1e3:>18.1f}{mem_mb(bat, pit):>14.2f}")
+    print(f"rows: batters {len(bat)} (legacy {len(bat_a)}), pitchers {len(pit)} (legacy {len(pit_a)})")
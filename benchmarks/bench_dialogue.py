@@ -0,0 +1,122 @@
+"""像素棒球場對話框：N 個 session 同時點擊時，每次點擊佔用伺服器 script thread 的時間與送出的 delta 數。
+
+舊版在伺服器逐字 markdown + time.sleep；新版整段一次送出，打字效果由瀏覽器 CSS 播放。
+啟動一個真的 streamlit server，以 websocket 模擬 N 個瀏覽器 session 同時送出 rerun。
+執行：python benchmarks/bench_dialogue.py [--sessions 1 4 16]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 對話框的兩種寫法；mode 由 query string 決定
+APP = f'''
+import sys
+import time
+
+import streamlit as st
+
+sys.path.insert(0, {ROOT!r})
+from shared.ballpark import dialogue_html
+
+desc = "我是場上的指揮官，想得分先過我這關！"
+if st.query_params.get("mode") == "legacy":
+    box = st.empty()
+    text = ""
+    for ch in desc:
+        text += ch
+        box.markdown(f"""
+        <div class="rpg-box-container">
+            <div class="rpg-box-inner">{{text}}</div>
+        </div>
+        """, unsafe_allow_html=True)
+        time.sleep(0.04)
+else:
+    st.markdown(dialogue_html(desc, animate=True), unsafe_allow_html=True)
+'''
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit server 啟動失敗")
+
+
+async def rerun(ws, mode):
+    msg = BackMsg()
+    msg.rerun_script.query_string = f"mode={mode}"
+    t = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+    deltas = 0
+    while True:
+        fwd = ForwardMsg()
+        fwd.ParseFromString(await ws.recv())
+        kind = fwd.WhichOneof("type")
+        deltas += kind == "delta"
+        if kind == "script_finished":
+            return time.perf_counter() - t, deltas
+
+
+async def concurrent_clicks(port, mode, n, rounds=3):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    sockets = [await websockets.connect(url, subprotocols=["streamlit"], max_size=None) for _ in range(n)]
+    try:
+        await asyncio.gather(*(rerun(ws, mode) for ws in sockets))  # 開啟頁面
+        samples = []
+        for _ in range(rounds):
+            # 所有 session 都已開好頁面，再同時點擊
+            out = await asyncio.gather(*(rerun(ws, mode) for ws in sockets))
+            samples += [t for t, _ in out]
+        return np.array(samples) * 1e3, out[0][1]
+    finally:
+        for ws in sockets:
+            await ws.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        script = os.path.join(d, "dialogue_app.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(APP)
+        port = free_port()
+        proc = start_server(script, port)
+        try:
+            print(f"{'sessions':>8}{'mode':>14}{'p50 (ms)':>12}{'max (ms)':>12}{'deltas/click':>14}")
+            for n in args.sessions:
+                for mode in ("legacy", "client-side"):
+                    samples, deltas = asyncio.run(concurrent_clicks(port, mode, n))
+                    print(f"{n:>8}{mode:>14}{np.median(samples):>12.0f}{samples.max():>12.0f}{deltas:>14}")
+        finally:
+            proc.terminate()
+            proc.wait()
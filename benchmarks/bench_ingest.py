@@ -0,0 +1,61 @@
+"""單日增量 (一季內數十列) 併入時：整份重建 vs 只重算受影響賽季。
+
+只比較記憶體內的重算，不寫檔。--scale N 把每季球員複製 N 份，模擬逐場資料量。
+執行：python benchmarks/bench_ingest.py [--scale 20]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import RAW_DATA_PATH, STANDINGS_PATH, build_tables_from, prepare_raw, update_tables
+from shared.ingest import upsert_raw
+from shared.sabermetrics import build_stat_tables_from, update_stat_tables
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+def daily_delta(raw, year=2024, n=40):
+    # 模擬一天的比賽：n 位打者各多 4 個打數 1 支安打
+    cols = ['ID', 'Year', 'Team Name_x', 'Name_clean', 'bat_PA', 'bat_AB', 'bat_H']
+    delta = raw[(raw['Year'] == year) & (raw['bat_PA'] > 0)].drop_duplicates(['ID', 'Team Name_x']).head(n)[cols]
+    return delta.assign(bat_PA=delta['bat_PA'] + 4, bat_AB=delta['bat_AB'] + 4, bat_H=delta['bat_H'] + 1)
+
+
+def scaled(raw, n):
+    copies = [raw.assign(Name_clean=raw['Name_clean'] + f'#{i}', ID=raw['ID'] + i * 100000) for i in range(1, n)]
+    return pd.concat([raw, *copies], ignore_index=True)
+
+
+if __name__ == '__main__':
+    scale = int(sys.argv[sys.argv.index('--scale') + 1]) if '--scale' in sys.argv else 1
+    raw_full = scaled(pd.read_csv(RAW_DATA_PATH, low_memory=False, float_precision='round_trip'), scale)
+    standings = pd.read_csv(STANDINGS_PATH)
+    tables = build_tables_from(prepare_raw(raw_full))
+    stats = build_stat_tables_from(prepare_raw(raw_full), standings)
+
+    delta = daily_delta(raw_full)
+    t_upsert, (merged, years) = timed(lambda: upsert_raw(raw_full, delta))
+    prepared = prepare_raw(merged)
+
+    def full():
+        return build_tables_from(prepared), build_stat_tables_from(prepared, standings)
+
+    def incremental():
+        return update_tables(tables, prepared, years), update_stat_tables(stats, prepared, standings, years)
+
+    t_full, _ = timed(full)
+    t_inc, (_, (*_, stat_years)) = timed(incremental)
+    print(f"raw: {len(raw_full)} rows, delta: {len(delta)} rows, seasons {years} (stats recomputed for {stat_years})")
+    print(f"{'upsert raw':<24}{t_upsert * 1e3:>10.1f} ms")
+    print(f"{'full rebuild':<24}{t_full * 1e3:>10.1f} ms")
+    print(f"{'incremental':<24}{t_inc * 1e3:>10.1f} ms")
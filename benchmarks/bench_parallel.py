@@ -0,0 +1,59 @@
+"""ParallelScorer / parallel_simulate_seasons 的多核心擴展性。
+
+執行：python benchmarks/bench_parallel.py [列數] [季數]
+在 16 核心機器上應看到接近線性的 speedup；worker 數超過實體核心時不再增加。
+"""
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from shared.data import PLAYER_FEATURES_PATH, build_app_table
+from shared.parallel import ParallelScorer, default_workers, parallel_simulate_seasons
+from shared.prediction import MODEL_PATH, build_feature_matrix, model_feature_order
+
+
+def worker_counts():
+    counts, n = [], 1
+    while n <= default_workers():
+        counts.append(n)
+        n *= 2
+    if counts[-1] != default_workers():
+        counts.append(default_workers())
+    return counts
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_seasons = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    model = joblib.load(MODEL_PATH)
+    (df_bat,) = build_app_table(PLAYER_FEATURES_PATH)
+    base = build_feature_matrix(df_bat, model_feature_order(model))
+    features = pd.concat([base] * (n_rows // len(base) + 1), ignore_index=True).iloc[:n_rows]
+
+    print(f"scoring {n_rows:,} rows (cores: {default_workers()})")
+    baseline = None
+    for workers in worker_counts():
+        with ParallelScorer(MODEL_PATH, features, workers=workers) as scorer:
+            scorer.predict()  # 暖機：等所有 worker 載入模型
+            t = time.perf_counter()
+            scorer.predict()
+            elapsed = time.perf_counter() - t
+        baseline = baseline or elapsed
+        print(f"  {workers:>2} workers: {elapsed:7.2f}s  speedup {baseline / elapsed:5.2f}x")
+
+    print(f"simulating {n_seasons:,} seasons")
+    p_home = np.random.default_rng(0).uniform(0.35, 0.65, size=(6, 6))
+    baseline = None
+    for workers in worker_counts():
+        t = time.perf_counter()
+        parallel_simulate_seasons(p_home, n_seasons, seed=1, workers=workers)
+        elapsed = time.perf_counter() - t
+        baseline = baseline or elapsed
+        print(f"  {workers:>2} workers: {elapsed:7.2f}s  speedup {baseline / elapsed:5.2f}x")
@@ -0,0 +1,53 @@
+"""雷達圖評分：舊版每次切換投手都對整張篩選表做 min-max vs 預先算好的百分位表查表。
+
+執行：python benchmarks/bench_percentiles.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import load_batters, load_pitchers
+from shared.percentiles import METRICS, percentile_table
+from shared.players import PlayerIndex
+
+
+def legacy_scores(df_pit, index, target):
+    # 儀表板舊版：每次 selectbox 變動都複製並重新掃描整張表
+    df_radar = df_pit[['Name', 'ERA', 'WHIP', 'SO', 'BB', 'IP']].copy()
+    for col, higher_is_better in METRICS['pit'].items():
+        lo, hi = df_radar[col].min(), df_radar[col].max()
+        df_radar[f'{col}_Score'] = (df_radar[col] - lo) / (hi - lo) * 100 if higher_is_better else (hi - df_radar[col]) / (hi - lo) * 100
+    label = next(p for p in index.positions(target) if p in df_radar.index)
+    avg = df_radar[[f'{c}_Score' for c in METRICS['pit']]].mean()
+    return [df_radar.loc[label, f'{c}_Score'] for c in METRICS['pit']], avg.tolist()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return np.median(samples) * 1e3
+
+
+if __name__ == '__main__':
+    df_bat, df_pit = load_batters(), load_pitchers()
+    index = PlayerIndex(df_pit)
+    names = df_pit['Name'].unique()[:200]
+
+    t = time.perf_counter()
+    bat_pct, pit_pct = percentile_table(df_bat, 'bat'), percentile_table(df_pit, 'pit')
+    t_build = (time.perf_counter() - t) * 1e3
+
+    categories = list(METRICS['pit'])
+    t_legacy = timed(lambda: [legacy_scores(df_pit, index, n) for n in names], 3) / len(names)
+    t_lookup = timed(lambda: [pit_pct.loc[index.positions(n)[0], categories].tolist() for n in names], 3) / len(names)
+
+    print(f"rows: {len(df_bat)} batters, {len(df_pit)} pitchers; build both tables {t_build:.1f} ms (once)")
+    print(f"{'per player switch':<22}{'ms':>8}")
+    print(f"{'legacy min-max':<22}{t_legacy:>8.2f}")
+    print(f"{'percentile lookup':<22}{t_lookup:>8.3f}")
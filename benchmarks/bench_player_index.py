@@ -0,0 +1,43 @@
+"""PlayerIndex 查詢與原本 str.strip() 布林遮罩的比較。
+
+執行：python benchmarks/bench_player_index.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import build_tables
+from shared.players import PlayerIndex
+from shared.rosters import TEAM_ROSTERS
+
+
+if __name__ == '__main__':
+    df_bat, _ = build_tables()
+    df = df_bat.assign(Name=df_bat['Name'].astype(str))
+    # 一次點擊約 20 位球員
+    names = [n for r in TEAM_ROSTERS.values() for n in r['batters']][:20]
+
+    def mask_lookup():
+        for name in names:
+            df[df['Name'].str.strip() == name.strip()].sort_values('Year', ascending=False)
+
+    index = PlayerIndex(df)
+
+    def index_lookup():
+        for name in names:
+            index.rows(name)
+
+    def position_lookup():
+        for name in names:
+            index.positions(name)
+
+    build = min(timeit.repeat(lambda: PlayerIndex(df), number=1, repeat=5))
+    mask = min(timeit.repeat(mask_lookup, number=10, repeat=5)) / 10
+    indexed = min(timeit.repeat(index_lookup, number=10, repeat=5)) / 10
+    positions = min(timeit.repeat(position_lookup, number=1000, repeat=5)) / 1000
+    print(f"table rows           : {len(df):,}")
+    print(f"index build (once)   : {build * 1e3:8.2f} ms")
+    print(f"mask lookups  x{len(names)}   : {mask * 1e3:8.2f} ms")
+    print(f"index rows    x{len(names)}   : {indexed * 1e3:8.2f} ms  ({mask / indexed:.0f}x)")
+    print(f"index positions x{len(names)} : {positions * 1e3:8.3f} ms  ({mask / positions:.0f}x)")
@@ -0,0 +1,60 @@
+"""大型散佈圖：舊版 px.scatter (SVG、每點文字標籤) vs shared.plotting.scatter 的伺服器成本與 payload。
+
+每次 rerun 的成本：舊版 = 建圖 + 序列化；新版圖已依篩選條件快取，只剩序列化。
+瀏覽器端繪製無法在這裡量測，以瀏覽器要畫的元素數代替：SVG 每點一個節點，文字標籤不論 SVG / WebGL 都要逐一排版。
+執行：python benchmarks/bench_plotting.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import load_batters
+from shared.plotting import scatter
+
+
+def timed(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t)
+    return np.median(samples) * 1e3, out
+
+
+def drawn(fig):
+    svg = sum(len(t.x) for t in fig.data if t.type == 'scatter')
+    labels = sum(1 for t in fig.data if t.text is not None for label in t.text if label)
+    return svg, labels
+
+
+def measure(name, df, **kwargs):
+    t_legacy, legacy = timed(lambda: px.scatter(df, x='AVG', y='OPS', color='Team', size='PA', hover_name='Name',
+                                                 text='Name', **kwargs))
+    t_legacy_json, legacy_json = timed(lambda: pio.to_json(legacy, validate=False))
+    t_new, new = timed(lambda: scatter(df, x='AVG', y='OPS', color='Team', size='PA', hover_name='Name',
+                                       label='Name', label_by='OPS', **kwargs))
+    t_new_json, new_json = timed(lambda: pio.to_json(new, validate=False))
+    print(f"{name:<18}{len(df):>7}{t_legacy + t_legacy_json:>11.0f}{t_new_json:>11.1f}"
+          f"{len(legacy_json) / 1024:>11.0f}{len(new_json) / 1024:>8.0f}"
+          f"{'%d / %d' % drawn(legacy):>15}{'%d / %d' % drawn(new):>12}  {legacy.data[0].type} -> {new.data[0].type}")
+
+
+if __name__ == '__main__':
+    df = load_batters()
+    # 放大到萬筆：複製球員季並加上微小擾動
+    rng = np.random.default_rng(0)
+    big = pd.concat([df] * 6, ignore_index=True)
+    big[['AVG', 'OPS']] = big[['AVG', 'OPS']] + rng.normal(0, 0.005, (len(big), 2))
+
+    print(f"{'':<18}{'points':>7}{'legacy ms':>11}{'cached ms':>11}"
+          f"{'legacy KB':>11}{'new KB':>8}{'legacy svg/lbl':>15}{'new svg/lbl':>12}")
+    measure("one year, PA>=100", df[(df['Year'] == 2024) & (df['PA'] >= 100)])
+    measure("all years, PA>=50", df[df['PA'] >= 50])
+    measure("all years, PA>=0", df)
+    measure("x6 synthetic", big)
@@ -0,0 +1,67 @@
+"""本機 BM25 檢索：固定問題集的 recall@k 與查詢延遲。
+
+執行：python benchmarks/bench_retrieval.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.data import load_batters, load_pitchers
+from shared.retrieval import TOP_K, LocalRetriever, collect_passages
+
+# (問題, 應該被找回的段落 id)
+QUERIES = [
+    ("林立 本季表現如何", "commentary:林立"),
+    ("江坤宇 上投手丘的表現", "commentary:江坤宇"),
+    ("陳冠宇 防禦率 WHIP", "commentary:陳冠宇"),
+    ("陳傑憲 球探評價", "commentary:陳傑憲"),
+    ("陳傑憲 2024 OPS", "bat:陳傑憲:2024"),
+    ("林立 2022 打擊率", "bat:林立:2022"),
+    ("王柏融 2017 全壘打", "bat:王柏融:2017"),
+    ("朱育賢 2020 打點", "bat:朱育賢:2020"),
+    ("陳晨威 2025 盜壘", "bat:陳晨威:2025"),
+    ("李凱威 2025 打擊成績", "bat:李凱威:2025"),
+    ("許基宏 2025 長打率", "bat:許基宏:2025"),
+    ("魔鷹 2024 全壘打", "bat:魔鷹:2024"),
+    ("古林睿煬 2024 三振", "pit:古林睿煬:2024"),
+    ("徐若熙 2024 防禦率", "pit:徐若熙:2024"),
+    ("鋼龍 2024 投球成績", "pit:鋼龍:2024"),
+    ("德保拉 2022 WHIP", "pit:德保拉:2022"),
+]
+
+
+if __name__ == '__main__':
+    passages = collect_passages(df_bat=load_batters(), df_pit=load_pitchers())
+    ids = {p['id'] for p in passages}
+    queries = [(q, want) for q, want in QUERIES if want in ids]
+
+    t = time.perf_counter()
+    built = LocalRetriever.build(passages)
+    t_build = time.perf_counter() - t
+
+    with tempfile.TemporaryDirectory() as d:
+        built.save(d)
+        t = time.perf_counter()
+        retriever = LocalRetriever.load(d)
+        t_load = time.perf_counter() - t
+
+        hits, latency = 0, []
+        for q, want in queries:
+            retriever.search(q)
+            t = time.perf_counter()
+            results = retriever.search(q)
+            latency.append(time.perf_counter() - t)
+            got = [p['id'] for _, p in results]
+            hits += want in got
+            if want not in got:
+                print(f"miss: {q} -> {got}")
+
+    latency = np.array(latency) * 1e3
+    print(f"passages {len(passages)}, vocab {len(built.vocab)}, queries {len(queries)}/{len(QUERIES)}")
+    print(f"build {t_build * 1e3:.0f} ms, load (mmap) {t_load * 1e3:.1f} ms")
+    print(f"recall@{TOP_K} {hits / len(queries):.2f}, latency p50 {np.median(latency):.2f} ms, "
+          f"p95 {np.percentile(latency, 95):.2f} ms")
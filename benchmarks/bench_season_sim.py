@@ -0,0 +1,33 @@
+"""賽季模擬器單核心吞吐量 (季/秒)。
+
+執行：python benchmarks/bench_season_sim.py [季數]
+"""
+import os
+import sys
+import time
+
+# 限制 BLAS 只用單核心
+for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ[var] = '1'
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.simulation import simulate_seasons
+
+
+if __name__ == '__main__':
+    n_seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    p_home = rng.uniform(0.35, 0.65, size=(6, 6))
+
+    simulate_seasons(p_home, 1_000, seed=1)
+    t = time.perf_counter()
+    result = simulate_seasons(p_home, n_seasons, seed=1)
+    elapsed = time.perf_counter() - t
+
+    print(result.round(4).to_string())
+    print(f"{n_seasons:,} seasons in {elapsed:.2f}s -> {n_seasons / elapsed:,.0f} seasons/s (single core)")
+
+    again = simulate_seasons(p_home, n_seasons, seed=1)
+    print(f"same seed reproducible: {again.equals(result)}")
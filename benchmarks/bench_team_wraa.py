@@ -0,0 +1,78 @@
+"""預測頁面每次點擊的 wRAA 計算：逐人 predict 與批次 predict 的比較。
+
+執行：python benchmarks/bench_team_wraa.py
+"""
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from shared.data import build_app_table, PLAYER_FEATURES_PATH
+from shared.prediction import build_feature_matrix, build_player_index, model_feature_order, predict_team_wraa
+
+
+# 舊版 get_team_wraa：逐人掃描 + 逐列 predict
+def legacy_team_wraa(model, df_bat, names, expected_order):
+    wraa_total = 0
+    found_names = []
+    for name in names:
+        hist = df_bat[
+            (df_bat['Name_Display'].str.strip() == name.strip()) &
+            (df_bat['Year_Display'].isin([2024, 2025]))
+        ].sort_values('Year_Display', ascending=False)
+
+        if not hist.empty:
+            found_names.append(name)
+            weights = [0.7, 0.3]
+            vals = []
+            for i in range(min(2, len(hist))):
+                row = hist.iloc[[i]]
+                feat_raw = row.drop(columns=['Name_Display', 'Team_Display', 'Year_Display', 'Real_OPS'], errors='ignore')
+                feat_aligned = feat_raw.reindex(columns=expected_order, fill_value=0)
+                feat_aligned = feat_aligned.apply(pd.to_numeric, errors='coerce').fillna(0)
+                vals.append(model.predict(feat_aligned)[0])
+
+            w_use = weights[:len(vals)]
+            w_norm = [w / sum(w_use) for w in w_use]
+            wraa_total += np.average(vals, weights=w_norm)
+    return wraa_total, found_names
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+if __name__ == '__main__':
+    model = joblib.load(os.path.join(ROOT_DIR, 'cpbl_ai_model.pkl'))
+    (df_bat,) = build_app_table(PLAYER_FEATURES_PATH)
+    order = model_feature_order(model)
+
+    # 取近兩季資料最多的 18 位打者當作兩隊打線
+    recent = df_bat[df_bat['Year_Display'].isin([2024, 2025])]
+    names = recent['Name_Display'].value_counts().index[:18].tolist()
+    home, away = names[:9], names[9:]
+
+    def legacy():
+        h = legacy_team_wraa(model, df_bat, home, order)[0]
+        a = legacy_team_wraa(model, df_bat, away, order)[0]
+        return np.array([h, a])
+
+    features = build_feature_matrix(df_bat, order)
+    index = build_player_index(df_bat)
+
+    t_legacy, ref = best_of(legacy, 3)
+    t_batch, (out, _) = best_of(lambda: predict_team_wraa(model, features, index, [home, away]), 10)
+
+    print(f"legacy per-player loop : {t_legacy * 1e3:8.1f} ms / click")
+    print(f"batched single predict : {t_batch * 1e3:8.1f} ms / click  ({t_legacy / t_batch:.1f}x)")
+    print(f"max |diff| = {np.abs(ref - out).max():.2e}")
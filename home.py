@@ -1,8 +1,11 @@
 import streamlit as st
 import os
 import sys
+from shared.prefetch import start_prefetch
 
 st.set_page_config(layout='wide', page_title='CPBL 棒球分析系統')
+# 背景先下載各頁的遠端素材 (球場、卡牌、短評、知識庫列表)
+start_prefetch()
 
 custom_css = """
 <style>
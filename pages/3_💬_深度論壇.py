@@ -1,7 +1,5 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 import sys
 import os
@@ -13,6 +11,9 @@ try:
     styles.apply_global_style()
 except ImportError:
     pass
+from shared.data import load_batters
+from shared.plotting import scatter
+from shared.sabermetrics import load_league_constants, sb_rate, wsb
 
 st.set_page_config(page_title="深度數據論壇", layout="wide")
 
@@ -31,70 +32,27 @@ st.markdown("""
 st.title("💬 深度數據論壇")
 st.markdown("### ⚾ Sabermetrics：用進階數據看棒球")
 
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('baseball_data.csv')
-    except FileNotFoundError:
-        st.error("找不到資料檔")
-        return pd.DataFrame()
-
-    numeric_cols = [
-        'bat_PA', 'bat_AB', 'bat_R', 'bat_H', 'bat_2B', 'bat_3B', 'bat_HR',
-        'bat_SF', 'bat_SH', 'bat_BB', 'bat_IBB', 'bat_HBP',
-        'bat_SO', 'bat_SB', 'bat_CS', 'bat_GIDP',
-        'bat_AVG', 'bat_OPS'
-    ]
-    for c in numeric_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
-
-    # 計算
-    # 一壘安打 (1B) = H - 2B - 3B - HR
-    if 'bat_H' in df.columns and 'bat_2B' in df.columns:
-        df['bat_1B'] = df['bat_H'] - df['bat_2B'] - df['bat_3B'] - df['bat_HR']
-    else:
-        df['bat_1B'] = 0
-
-    team_map = {
-        '統一獅': '統一7-ELEVEn獅', '統一': '統一7-ELEVEn獅',
-        '桃猿': '樂天桃猿', 'Lamigo': '樂天桃猿', 'Rakuten': '樂天桃猿',
-        '兄弟': '中信兄弟', '兄弟象': '中信兄弟',
-        '富邦': '富邦悍將', '義大': '富邦悍將',
-        '味全': '味全龍', '台鋼': '台鋼雄鷹'
-    }
-    target_teams = ['統一7-ELEVEn獅', '台鋼雄鷹', '中信兄弟', '樂天桃猿', '味全龍', '富邦悍將']
-
-    cols_needed = [
-        'Name_clean', 'Team Name_x', 'Year',
-        'bat_PA', 'bat_AB', 'bat_R', 'bat_H', 'bat_1B', 'bat_BB', 'bat_HBP', 'bat_IBB',
-        'bat_SF', 'bat_AVG', 'bat_OPS', 'bat_SB', 'bat_CS'
-    ]
-    valid_cols = [c for c in cols_needed if c in df.columns]
-
-    df_sorted = df[valid_cols].sort_values(by=['Year', 'bat_PA'], ascending=[False, False])
-    df_bat = df_sorted.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
-
-    rename_dict = {
-        'Name_clean': 'Name', 'Team Name_x': 'Team',
-        'bat_OPS': 'OPS', 'bat_AVG': 'AVG',
-        'bat_SB': 'SB', 'bat_CS': 'CS', 'bat_PA': 'PA',
-        'bat_1B': '1B', 'bat_BB': 'BB', 'bat_HBP': 'HBP', 'bat_IBB': 'IBB',
-        'bat_R': 'R', 'bat_AB': 'AB', 'bat_H': 'H', 'bat_SF': 'SF'
-    }
-    df_bat = df_bat.rename(columns={k:v for k,v in rename_dict.items() if k in df_bat.columns})
-
-    df_bat['Team'] = df_bat['Team'].replace(team_map)
-    df_bat = df_bat[df_bat['Team'].isin(target_teams)]
-    df_bat = df_bat[df_bat['PA'] > 0]
-
-    return df_bat
-
-df = load_data()
+df = load_batters()
 
 if df.empty:
     st.stop()
 
+# 同一 (年份, 打席門檻) 的 Figure 所有 session 共用；只標 OPS 前幾名，其餘靠 hover
+@st.cache_resource(show_spinner=False, max_entries=64)
+def avg_ops_figure(sel_year, min_pa):
+    df_topic1 = df[(df['Year'] == sel_year) & (df['PA'] >= min_pa)]
+    fig = scatter(
+        df_topic1, x='AVG', y='OPS',
+        color='Team', size='PA', hover_name='Name',
+        label='Name', label_by='OPS',
+        title=f"{sel_year} 年打者分佈：AVG vs OPS"
+    )
+    avg_mean = df_topic1['AVG'].mean()
+    ops_mean = df_topic1['OPS'].mean()
+    fig.add_vline(x=avg_mean, line_dash="dash", line_color="gray", annotation_text="平均AVG")
+    fig.add_hline(y=ops_mean, line_dash="dash", line_color="gray", annotation_text="平均OPS")
+    return fig
+
 # 議題選擇
 topic = st.radio(
     "請選擇想要探討的議題：",
@@ -122,17 +80,7 @@ if "議題一" in topic:
         corr = df_topic1['AVG'].corr(df_topic1['OPS'])
         st.info(f"💡 **數據發現**：在 {sel_year} 年，打擊率與 OPS 的相關係數為 **{corr:.2f}**。")
 
-        fig = px.scatter(
-            df_topic1, x='AVG', y='OPS',
-            color='Team', size='PA', hover_name='Name',
-            text='Name',
-            title=f"{sel_year} 年打者分佈：AVG vs OPS"
-        )
-        avg_mean = df_topic1['AVG'].mean()
-        ops_mean = df_topic1['OPS'].mean()
-        fig.add_vline(x=avg_mean, line_dash="dash", line_color="gray", annotation_text="平均AVG")
-        fig.add_hline(y=ops_mean, line_dash="dash", line_color="gray", annotation_text="平均OPS")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(avg_ops_figure(sel_year, min_pa), use_container_width=True)
     else:
         st.warning("此條件下無資料。")
 
@@ -161,43 +109,16 @@ elif "議題二" in topic:
 
     # 計算 wSB 參數
     if not df_topic2.empty:
-        # 計算聯盟總和
-        lg_R = df_topic2['R'].sum()
-        # 估算 Outs (Outs = AB - H + CS + SF)
-        lg_Outs = (df_topic2['AB'].sum() - df_topic2['H'].sum()) + df_topic2['CS'].sum() + df_topic2['SF'].sum()
-        if lg_Outs == 0: lg_Outs = 1
-
-        # 動態計算 runCS (FanGraphs 公式: 2 * R/Outs + 0.075)
-        runs_per_out = lg_R / lg_Outs
-        runSB = 0.2
-        runCS = -1 * (2 * runs_per_out + 0.075)
-
-        # 計算 lgwSB
-        lg_SB = df_topic2['SB'].sum()
-        lg_CS = df_topic2['CS'].sum()
-        # 上壘機會 (Singles + BB + HBP - IBB)
-        lg_1B = df_topic2['1B'].sum()
-        lg_BB = df_topic2['BB'].sum()
-        lg_HBP = df_topic2['HBP'].sum()
-        lg_IBB = df_topic2['IBB'].sum()
-
-        lg_opportunities = lg_1B + lg_BB + lg_HBP - lg_IBB
-        if lg_opportunities == 0: lg_opportunities = 1
-
-        lgwSB = (lg_SB * runSB + lg_CS * runCS) / lg_opportunities
-
-        def calculate_wSB(row):
-            opportunities = row['1B'] + row['BB'] + row['HBP'] - row['IBB']
-            # wSB
-            val = (row['SB'] * runSB) + (row['CS'] * runCS) - (lgwSB * opportunities)
-            return val
-
-        df_topic2['wSB'] = df_topic2.apply(calculate_wSB, axis=1)
+        # 聯盟常數由每年的聯盟總和組合而成 (已快取)
+        constants = load_league_constants(tuple(sorted(sel_years)))
+        runSB, runCS = constants['runSB'], constants['runCS']
+
+        df_topic2['wSB'] = wsb(df_topic2, constants)
         df_topic2['Attempt'] = df_topic2['SB'] + df_topic2['CS']
 
         # 過濾
         df_filtered = df_topic2[df_topic2['Attempt'] >= min_sb_attempt].copy()
-        df_filtered['SB_Rate'] = df_filtered.apply(lambda x: (x['SB']/x['Attempt']*100) if x['Attempt']>0 else 0, axis=1)
+        df_filtered['SB_Rate'] = sb_rate(df_filtered)
 
         st.info(f"📊 **本期參數**：runCS (失敗扣分) = **{runCS:.3f}** (約為成功的 {abs(runCS/runSB):.1f} 倍代價)")
 
@@ -226,10 +147,10 @@ elif "議題二" in topic:
 
         # 表 2：高成功率不代表高貢獻
         st.subheader("📉 成功率 vs wSB：高成功率不代表高貢獻")
-        fig2 = px.scatter(
+        fig2 = scatter(
             df_filtered, x='SB_Rate', y='wSB',
             color='Team', size='Attempt', hover_name='Name',
-            text='Name',
+            label='Name', label_by='wSB',
             labels={'SB_Rate': '盜壘成功率 (%)', 'wSB': 'wSB (得分貢獻)'},
             title="有些球員成功率高(右邊)，但因為跑得少或機會成本高，wSB 其實不高"
         )
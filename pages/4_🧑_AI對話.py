@@ -1,11 +1,14 @@
 import streamlit as st
-import os
-import requests
-import time
 from google import genai
 from shared.styles import apply_global_style
+from shared.rag import initialize_rag, store_version
+from shared.chat import ResponseCache, stream_answer
+from shared.retrieval import format_context, load_local_retriever
+from shared.stat_query import load_stat_query
+from shared.prefetch import start_prefetch
 
 apply_global_style()
+start_prefetch()
 st.header("🧑‍💼 AI 對話系統")
 
 if "GEMINI_API_KEY" in st.secrets:
@@ -15,89 +18,34 @@ else:
     st.stop()
 client = genai.Client(api_key=gemini_key)
 
-GITHUB_USER = "ChewyChloe"
-GITHUB_REPO = "cpbl-project"
-GITHUB_FOLDER = "AI_RAG"
-GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{GITHUB_FOLDER}"
-TARGET_STORE_NAME = "CPBL_Scout_Knowledge_v6"
+# 檢索後端：file_search (Gemini 遠端知識庫) 或 local (本機 BM25 索引，不需連 GitHub / file-search store)
+RAG_BACKEND = st.secrets.get("RAG_BACKEND", "file_search")
 
+# 整個 server process 只同步一次，之後的 rerun 直接沿用 store 名稱
+@st.cache_resource(show_spinner="同步知識庫中...")
 def auto_initialize_rag(_client):
-    store = None
+    store_name = initialize_rag(_client)
+    if not store_name:
+        # 不快取失敗結果，下次 rerun 重試
+        raise RuntimeError("知識庫初始化失敗")
+    return store_name, store_version(store_name)
 
-    try:
-        for s in _client.file_search_stores.list():
-            if s.display_name == TARGET_STORE_NAME:
-                store = s
-                break
-    except Exception:
-        pass
-
-    if not store:
-        try:
-            store = _client.file_search_stores.create(
-                config={'display_name': TARGET_STORE_NAME}
-            )
-        except Exception as e:
-            print(f"建立 Store 失敗: {e}")
-            return None
-
-    existing_files = []
-    try:
-        pager = _client.file_search_stores.list_files(file_search_store_name=store.name)
-        existing_files = list(pager)
-    except:
-        pass
-
-    if len(existing_files) == 0:
-        try:
-            res = requests.get(GITHUB_API_URL)
-            if res.status_code == 200:
-                files_metadata = res.json()
-                for i, file_info in enumerate(files_metadata):
-                    original_name = file_info['name']
-                    lower_name = original_name.lower()
-
-                    if lower_name.endswith(('.pdf', '.txt', '.docx')):
-                        f_res = requests.get(file_info['download_url'])
-
-                        if f_res.status_code == 200:
-                            safe_ext = ".pdf" if ".pdf" in lower_name else ".txt" if ".txt" in lower_name else ".docx"
-                            safe_temp_name = f"temp_doc_{i}{safe_ext}"
-
-                            with open(safe_temp_name, "wb") as f:
-                                f.write(f_res.content)
-
-                            if os.path.getsize(safe_temp_name) > 0:
-                                mime_type = "application/pdf"
-                                if safe_ext == ".txt": mime_type = "text/plain"
-                                elif safe_ext == ".docx": mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-
-                                try:
-                                    _client.file_search_stores.upload_to_file_search_store(
-                                        file=safe_temp_name,
-                                        file_search_store_name=store.name,
-                                        config={
-                                            'display_name': original_name,
-                                            'mime_type': mime_type
-                                        }
-                                    )
-                                    time.sleep(1)
-                                except Exception as e:
-                                    print(f"上傳失敗: {e}")
-
-                            if os.path.exists(safe_temp_name):
-                                os.remove(safe_temp_name)
-        except Exception as e:
-            print(f"GitHub 同步錯誤: {e}")
-
-    return store.name if store else None
+@st.cache_resource
+def load_response_cache():
+    return ResponseCache()
 
 # 初始化
-store_name = auto_initialize_rag(client)
-
+store_name = None
+if RAG_BACKEND != "local":
+    try:
+        store_name, knowledge_version = auto_initialize_rag(client)
+    except RuntimeError:
+        st.warning("⚠️ 知識庫初始化失敗，改用本機檢索。")
 if not store_name:
-    st.error("⚠️ 知識庫初始化失敗。")
-    st.stop()
+    retriever = load_local_retriever()
+    knowledge_version = f"local-{retriever.version}"
+response_cache = load_response_cache()
+stat_query = load_stat_query()
 
 # 對話介面
 if "messages" not in st.session_state:
@@ -113,18 +61,16 @@ if prompt := st.chat_input("請教專業球探分析..."):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("思考中..."):
-            try:
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config={
-                        "tools": [{
-                            "file_search": {
-                                "file_search_store_names": [store_name]
-                            }
-                        }],
-                        "system_instruction": """
+        try:
+            # 單純查數據的問題直接查表；同樣的問題 (且知識庫沒變) 直接用快取的回答
+            answer = stat_query.answer(prompt)
+            if answer is None:
+                answer = response_cache.get(prompt, knowledge_version)
+            if answer is not None:
+                st.markdown(answer)
+            else:
+                config = {
+                    "system_instruction": """
                         你是一位專業的棒球研究員。
                         1. 當使用者問到具體數據或球探報告時，請優先參考「知識庫」中的檔案回答。
                         2. 如果知識庫中沒有相關資訊，或者使用者是在問一般棒球規則、歷史或閒聊，請善用你的「通用棒球知識」直接回答。
@@ -132,10 +78,24 @@ if prompt := st.chat_input("請教專業球探分析..."):
                         4. 語氣輕鬆不嚴肅
                         5. 名字：Brian
                         """
-                    }
-                )
-                st.markdown(response.text)
-                st.session_state.messages.append({"role": "assistant", "content": response.text})
+                }
+                if store_name:
+                    contents = prompt
+                    config["tools"] = [{
+                        "file_search": {
+                            "file_search_store_names": [store_name]
+                        }
+                    }]
+                else:
+                    # 本機檢索到的段落放在問題前面，問題本身不變；數字可由模型呼叫查表工具取得
+                    contents = [format_context(retriever.search(prompt)), prompt]
+                    config["tools"] = [stat_query.lookup_player_stat]
+                answer = st.write_stream(stream_answer(client, contents, config))
+                response_cache.put(prompt, knowledge_version, answer)
+            st.session_state.messages.append({"role": "assistant", "content": answer})
+
+        except Exception as e:
+            st.error(f"生成回應時發生錯誤: {e}")
 
-            except Exception as e:
-                st.error(f"生成回應時發生錯誤: {e}")
+stats = response_cache.stats()
+st.sidebar.caption(f"回答快取：{stats['entries']} 筆，命中率 {stats['hit_rate']:.0%} ({stats['hits']}/{stats['hits'] + stats['misses']})")
@@ -1,83 +1,67 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import requests
 import json
+from shared.assets import fetch
+from shared.cards import COMMENTARY_MAX_AGE, COMMENTARY_URLS, LOCAL_COMMENTARY, PLAYER_PHOTOS
+from shared.percentiles import load_batter_percentiles, load_pitcher_percentiles
+from shared.prefetch import start_prefetch
+from shared.players import build_roster, load_batter_index, load_pitcher_index, search_roster
 
 st.set_page_config(page_title="球員介面", page_icon="🃏", layout="wide")
+start_prefetch()
 
-JSON_URL = "https://raw.githubusercontent.com/ChewyChloe/cpbl-project/refs/heads/main/player_commentary.json"
-DATA_URL = "https://raw.githubusercontent.com/ChewyChloe/cpbl-project/d58371c954f80fac88be0eaf55943453dfe3ee0a/baseball_data.csv"
-
-# 球員名單、照片
+# 精選球員 (排在最前面)
 TARGET_PLAYERS = ['江坤宇', '林立', '陳冠宇', '陳傑憲']
-PLAYER_PHOTOS = {
-    '江坤宇': 'https://imgcdn.cna.com.tw/www/WebPhotos/800/20241001/824x1024_wmkn_0_C20241001000234.jpg',
-    '林立': 'https://img.ltn.com.tw/Upload/sports/page/800/2023/12/22/120.jpg',
-    '陳冠宇': 'https://hips.hearstapps.com/hmg-prod/images/pitcher-chen-kuan-yu-of-chinese-taipei-reacts-at-the-end-of-news-photo-1732522777.jpg',
-    '陳傑憲': 'https://img.ltn.com.tw/Upload/sports/page/800/2025/06/04/121.jpg'
-}
-TEAM_FIX = {
-    '江坤宇': '中信兄弟',
-    '林立': '樂天桃猿',
-    '陳冠宇': '樂天桃猿',
-    '陳傑憲': '統一獅'
-}
+CARDS_PER_PAGE = 4
 
 @st.cache_data
-def load_data():
+def load_commentaries():
+    for url in COMMENTARY_URLS:
+        try:
+            response = fetch(url, max_age=COMMENTARY_MAX_AGE)
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            pass
+
     try:
-        df = pd.read_csv(DATA_URL)
-        numeric_cols = ['bat_AVG', 'bat_OPS', 'bat_HR', 'bat_SB', 'bat_RBI',
-                        'pit_ERA', 'pit_W', 'pit_SO', 'pit_WHIP', 'pit_IP']
-        for c in numeric_cols:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
-    except Exception as e:
-        return pd.DataFrame(), {}
-
-    commentaries = {}
+        with open(LOCAL_COMMENTARY, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# 照片由伺服器從磁碟快取送出 (啟動時已預先下載)；抓不到時交給瀏覽器直接載入原網址
+@st.cache_data(show_spinner=False)
+def load_photo(url):
     try:
-        response = requests.get(JSON_URL)
+        response = fetch(url)
         if response.status_code == 200:
-            commentaries = response.json()
-        else:
-            alt_url = JSON_URL.replace("/refs/heads/main/", "/main/")
-            response = requests.get(alt_url)
-            if response.status_code == 200:
-                commentaries = response.json()
-    except Exception as e:
+            return response.content
+    except Exception:
         pass
+    return url
 
-    return df, commentaries
+# 卡牌名單：每位球員一張，精選球員排最前面
+@st.cache_data(show_spinner=False)
+def load_roster(year=None):
+    return build_roster(load_batter_index().df, load_pitcher_index().df, year, featured=TARGET_PLAYERS)
 
-# 雷達圖
-def create_radar_chart(player_data):
-    player_name = player_data['Name_clean']
-    is_pitcher = player_data.get('pit_IP', 0) > 0
+# 雷達圖：半徑為同年度聯盟百分位 (0~100)，滑鼠移上去顯示實際數據
+RADAR_AXES = {
+    'bat': {'AVG': '打擊率', 'OPS': 'OPS', 'HR': '全壘打', 'RBI': '打點', 'SB': '盜壘'},
+    'pit': {'ERA': '防禦率', 'WHIP': 'WHIP', 'SO': '奪三振', 'BB': '保送', 'IP': '局數'},
+}
+
+def create_radar_chart(player_data, percentiles, is_pitcher):
+    player_name = player_data['Name']
 
     fig = go.Figure()
 
-    if is_pitcher:
-        categories = ['勝投', '奪三振', '局數', '防禦率', 'WHIP']
-        real_values = [
-            player_data.get('pit_W', 0), player_data.get('pit_SO', 0), player_data.get('pit_IP', 0),
-            player_data.get('pit_ERA', 0), player_data.get('pit_WHIP', 0)
-        ]
-        plot_values = [
-            min(real_values[0] * 5, 100), min(real_values[1] * 0.5, 100), min(real_values[2] * 0.5, 100),
-            max((5 - real_values[3]) * 20, 0), max((2 - real_values[4]) * 50, 0)
-        ]
-    else:
-        categories = ['打擊率', 'OPS', '全壘打', '打點', '盜壘']
-        real_values = [
-            player_data.get('bat_AVG', 0), player_data.get('bat_OPS', 0), player_data.get('bat_HR', 0),
-            player_data.get('bat_RBI', 0), player_data.get('bat_SB', 0)
-        ]
-        plot_values = [
-            min(real_values[0] * 300, 100), min(real_values[1] * 100, 100), min(real_values[2] * 4, 100),
-            min(real_values[3] * 1, 100), min(real_values[4] * 3, 100)
-        ]
+    axes = RADAR_AXES['pit' if is_pitcher else 'bat']
+    categories = list(axes.values())
+    real_values = [player_data.get(col, 0) for col in axes]
+    plot_values = [0 if pd.isna(percentiles[col]) else percentiles[col] for col in axes]
 
     fig.add_trace(go.Scatterpolar(
         r=plot_values,
@@ -86,8 +70,8 @@ def create_radar_chart(player_data):
         name=player_name,
         line_color='#FFD700',
         fillcolor='rgba(255, 215, 0, 0.3)',
-        hovertemplate="%{theta}: <b>%{text}</b><extra></extra>",
-        text=[f"{v:.2f}" if isinstance(v, float) else v for v in real_values]
+        hovertemplate="%{theta}: <b>%{text}</b> (PR %{r:.0f})<extra></extra>",
+        text=[f"{v:.2f}" for v in real_values]
     ))
 
     fig.update_layout(
@@ -114,8 +98,19 @@ def create_radar_chart(player_data):
         plot_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white')
     )
+    if not percentiles['qualified']:
+        fig.update_layout(title=dict(text="未達規定打席/局數，百分位僅供參考", font=dict(size=11)))
     return fig
 
+# 只有畫面上的卡牌才會產生雷達圖；同一 (球員, 年份) 的圖表設定只算一次
+@st.cache_data(show_spinner=False)
+def radar_figure(player_name, year, is_pitcher):
+    index = load_pitcher_index() if is_pitcher else load_batter_index()
+    table = load_pitcher_percentiles() if is_pitcher else load_batter_percentiles()
+    # 百分位表與資料表逐列對齊，同一個位置直接取用
+    pos = index.positions(player_name, [year])[0]
+    return create_radar_chart(index.df.iloc[pos], table.iloc[pos], is_pitcher).to_dict()
+
 # 佈局
 st.title("🃏球員介紹卡牌")
 
@@ -135,59 +130,65 @@ div[data-testid="stVerticalBlockBorderWrapper"] * {
 </style>
 """, unsafe_allow_html=True)
 
-df, commentaries = load_data()
+bat_index, pit_index = load_batter_index(), load_pitcher_index()
+commentaries = load_commentaries()
 
-if df.empty:
+if bat_index.df.empty and pit_index.df.empty:
     st.error("⚠️ 無法讀取資料")
     st.stop()
 
-df_players = df[df['Name_clean'].isin(TARGET_PLAYERS)].copy()
-df_players = df_players.sort_values('Year', ascending=False).drop_duplicates(subset='Name_clean', keep='first')
+years = sorted(set(bat_index.df['Year']) | set(pit_index.df['Year']), reverse=True)
+c1, c2, c3 = st.columns([2, 1, 1])
+query = c1.text_input("🔍 搜尋球員或球隊", key="card_query")
+season = c2.selectbox("球季", ["最新球季", *years], key="card_season")
+
+roster = search_roster(load_roster(None if season == "最新球季" else int(season)), query)
+n_pages = max(1, -(-len(roster) // CARDS_PER_PAGE))
+# 搜尋條件改變後頁數可能變少，超出範圍就回到第一頁
+if st.session_state.get("card_page", 1) > n_pages:
+    st.session_state.card_page = 1
+page = c3.number_input(f"頁數 (共 {n_pages} 頁)", min_value=1, max_value=n_pages, key="card_page")
+st.caption(f"共 {len(roster)} 位球員")
 
 st.divider()
 
 cols = st.columns(2) + st.columns(2)
 
 count = 0
-for i, player_name in enumerate(TARGET_PLAYERS):
-    if i >= 4: break
-
+start = (page - 1) * CARDS_PER_PAGE
+for i, card in enumerate(roster.iloc[start:start + CARDS_PER_PAGE].itertuples()):
     col = cols[i]
-    rows = df_players[df_players['Name_clean'] == player_name]
+    player_name, year, is_pitcher = card.Name, int(card.Year), bool(card.is_pitcher)
+    data = (pit_index if is_pitcher else bat_index).latest(player_name, [year])
 
-    if rows.empty:
+    if data is None:
         col.warning(f"缺失 {player_name}")
         continue
 
-    data = rows.iloc[0]
-    comment = commentaries.get(player_name,)
-    fig = create_radar_chart(data)
+    comment = commentaries.get(player_name) or "尚無球評"
     photo = PLAYER_PHOTOS.get(player_name, "")
 
     # 判斷身分
-    role = "投手" if data.get('pit_IP', 0) > 0 else "打擊手"
-
-    # 判斷隊名
-    team_name = data.get('Team Name_x')
-    if pd.isna(team_name) or str(team_name).lower() == 'nan':
-        team_name = TEAM_FIX.get(player_name, "CPBL")
+    role = "投手" if is_pitcher else "打擊手"
+    team_name = data.get('Team', "CPBL")
 
     with col:
         with st.container(height=600, border=True):
             st.subheader(player_name)
-            st.caption(f"{team_name} | {role}")
+            st.caption(f"{year} {team_name} | {role}")
 
             t1, t2 = st.tabs(["📷 照片", "📊 分析"])
 
             with t1:
-                if photo: st.image(photo, use_container_width=True)
+                if photo: st.image(load_photo(photo), use_container_width=True)
                 else: st.info("無照片")
 
             with t2:
                 st.markdown("#### 🧐 AI 球評")
                 st.info(comment)
-                st.markdown("#### 𖣠 能力雷達")
-                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+                st.markdown("#### 𖣠 能力雷達 (聯盟百分位)")
+                st.plotly_chart(radar_figure(player_name, year, is_pitcher), use_container_width=True,
+                                config={'displayModeBar': False})
     count += 1
 
 if count == 0:
@@ -1,33 +1,11 @@
-import time
-from io import BytesIO
-
-import requests
 import streamlit as st
-from PIL import Image
 from streamlit_image_coordinates import streamlit_image_coordinates
 
-st.set_page_config(page_title="小互動", page_icon="👾", layout="wide")
+from shared.ballpark import FIELD_W, IMAGES, build_field_states, dialogue_html, load_atlas
+from shared.prefetch import start_prefetch
 
-BASE_URL = "https://raw.githubusercontent.com/ChewyChloe/cpbl-project/main/game"
-
-ASSET_VER = "2025-12-24-1"
-
-def v(url: str) -> str:
-    return f"{url}?v={ASSET_VER}"
-
-IMAGES = {
-    "BG": v(f"{BASE_URL}/playground.png"),
-    "P": v(f"{BASE_URL}/P.png"),
-    "C": v(f"{BASE_URL}/C.png"),
-    "1B": v(f"{BASE_URL}/1B.png"),
-    "2B": v(f"{BASE_URL}/2B.png"),
-    "3B": v(f"{BASE_URL}/3B.png"),
-    "SS": v(f"{BASE_URL}/SS.png"),
-    "LF": v(f"{BASE_URL}/LF.png"),
-    "CF": v(f"{BASE_URL}/CF.png"),
-    "RF": v(f"{BASE_URL}/RF.png"),
-    "Batter": v(f"{BASE_URL}/batter.png"),
-}
+st.set_page_config(page_title="小互動", page_icon="👾", layout="wide")
+start_prefetch()
 
 players_data = {
     "P": {"name": "王牌投手", "desc": "我是球場上的獨裁者，掌控比賽節奏！"},
@@ -42,23 +20,6 @@ players_data = {
     "Batter": {"name": "打擊者", "desc": "我的工作只有一個：把那顆小白球轟出場外！"},
 }
 
-FIELD_W = 800
-FIELD_H = 600
-
-# 位置
-PLACEMENTS = {
-    "P": {"top": 0.57, "left": 0.40, "w": 135, "h": 135},
-    "C": {"top": 0.80, "left": 0.42, "w": 120, "h": 120},
-    "Batter": {"top": 0.70, "left": 0.37, "w": 135, "h": 135},
-    "1B": {"top": 0.55, "left": 0.63, "w": 135, "h": 135},
-    "2B": {"top": 0.38, "left": 0.52, "w": 110, "h": 110},
-    "3B": {"top": 0.58, "left": 0.22, "w": 135, "h": 135},
-    "SS": {"top": 0.40, "left": 0.32, "w": 80, "h": 80},
-    "LF": {"top": 0.28, "left": 0.15, "w": 135, "h": 135},
-    "CF": {"top": 0.18, "left": 0.40, "w": 135, "h": 135},
-    "RF": {"top": 0.32, "left": 0.70, "w": 135, "h": 135},
-}
-
 # 對話框）
 st.markdown("""
 <style>
@@ -97,40 +58,29 @@ st.markdown("""
     margin-left: 10px;
     box-shadow: 3px 3px 0px #000000;
 }
+.rpg-char {
+    opacity: 0;
+    animation: rpg-type 0s forwards;
+}
+@keyframes rpg-type {
+    to { opacity: 1; }
+}
 </style>
 """, unsafe_allow_html=True)
 
 # 點擊判定
-@st.cache_data(show_spinner=False)
-def fetch_image(url: str, ver: str) -> Image.Image:
-    r = requests.get(url, timeout=20)
-    r.raise_for_status()
-    return Image.open(BytesIO(r.content)).convert("RGBA")
+# 11 種球場畫面 (未選取 + 每個角色放大) 整個 process 只合成、編碼一次，點擊時直接取用
+@st.cache_resource(show_spinner="載入球場素材...")
+def load_field_states():
+    atlas, rects = load_atlas()
+    return build_field_states(atlas, rects)
 
 def build_map(selected_role: str | None):
-    bg = fetch_image(IMAGES["BG"], ASSET_VER).resize((FIELD_W, FIELD_H))
-    regions = {}
-
-    for role, p in PLACEMENTS.items():
-        scale = 1.3 if role == selected_role else 1.0
-        w = int(p["w"] * scale)
-        h = int(p["h"] * scale)
-
-        sprite = fetch_image(IMAGES[role], ASSET_VER).resize((w, h))
-
-        x = int(p["left"] * FIELD_W)
-        y = int(p["top"] * FIELD_H)
+    return load_field_states()[selected_role]
 
-        bg.alpha_composite(sprite, (x, y))
-        regions[role] = (x, y, x + w, y + h)
-
-    return bg, regions
-
-def detect_role(x: int, y: int, regions: dict) -> str | None:
-    for role, (x1, y1, x2, y2) in regions.items():
-        if x1 <= x <= x2 and y1 <= y <= y2:
-            return role
-    return None
+def detect_role(x: int, y: int, hit_map) -> str | None:
+    # 逐像素遮罩：重疊時以上層為準，sprite 透明處不算點到
+    return hit_map.role_at(x, y)
 
 # 狀態
 if "selected_role" not in st.session_state:
@@ -145,14 +95,14 @@ st.title("👾 像素棒球場")
 left, right = st.columns([2.2, 1.0], vertical_alignment="top")
 
 with left:
-    field_img, regions = build_map(st.session_state.selected_role)
+    field_img, hit_map = build_map(st.session_state.selected_role)
     clicked = streamlit_image_coordinates(field_img, width=FIELD_W)
 
     if clicked and "x" in clicked and "y" in clicked:
         xy = (int(clicked["x"]), int(clicked["y"]))
         if xy != st.session_state.last_click:
             st.session_state.last_click = xy
-            st.session_state.selected_role = detect_role(xy[0], xy[1], regions)
+            st.session_state.selected_role = detect_role(xy[0], xy[1], hit_map)
             if st.session_state.selected_role != st.session_state.last_typed_role:
                 st.session_state.last_typed_role = None
 
@@ -165,25 +115,10 @@ with right:
         st.image(IMAGES[role], width=180)
 
         st.markdown(f'<div class="char-name-tag">{data["name"]}</div>', unsafe_allow_html=True)
-        box = st.empty()
-
-        if st.session_state.last_typed_role != role:
-            st.session_state.last_typed_role = role
-            text = ""
-            for ch in data["desc"]:
-                text += ch
-                box.markdown(f"""
-                <div class="rpg-box-container">
-                    <div class="rpg-box-inner">{text}</div>
-                </div>
-                """, unsafe_allow_html=True)
-                time.sleep(0.04)
-        else:
-            box.markdown(f"""
-            <div class="rpg-box-container">
-                <div class="rpg-box-inner">{data["desc"]}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        # 第一次選到這個角色才播放打字效果；動畫在瀏覽器端跑，伺服器只送出一次
+        animate = st.session_state.last_typed_role != role
+        st.session_state.last_typed_role = role
+        st.markdown(dialogue_html(data["desc"], animate=animate), unsafe_allow_html=True)
     else:
         st.markdown("""
         <div class="rpg-box-container">
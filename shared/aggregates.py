@@ -0,0 +1,49 @@
+import numpy as np
+import streamlit as st
+
+from shared.data import load_batters, load_pitchers
+
+TEAM_KEYS = ['Year', 'Team']
+
+
+def _weighted(sums, value_cols, weight_col):
+    # sum(x * w) / sum(w)；權重為 0 時沿用舊版 get_weighted_average 回傳 0
+    weight = sums[weight_col]
+    for col in value_cols:
+        sums[col] = np.where(weight > 0, sums[f'{col}_x_w'] / weight.where(weight > 0, 1), 0.0)
+    return sums.drop(columns=[f'{c}_x_w' for c in value_cols])
+
+
+def build_team_seasons(df_bat, df_pit):
+    # 每個 (年度, 球隊) 一列：打者 PA 加權 OPS/AVG，投手 IP 加權 ERA/WHIP，以及各項總和
+    bat = df_bat[TEAM_KEYS].assign(
+        PA=df_bat['PA'].astype(float),
+        HR=df_bat['HR'].astype(float),
+        SB=df_bat['SB'].astype(float),
+        OPS_x_w=df_bat['OPS'].astype(float) * df_bat['PA'],
+        AVG_x_w=df_bat['AVG'].astype(float) * df_bat['PA'],
+    )
+    bat = bat.groupby(TEAM_KEYS, observed=True).sum().reset_index()
+    bat = _weighted(bat, ['OPS', 'AVG'], 'PA')
+
+    pit = df_pit[TEAM_KEYS].assign(
+        IP=df_pit['IP'].astype(float),
+        SO=df_pit['SO'].astype(float),
+        BB=df_pit['BB'].astype(float),
+        ERA_x_w=df_pit['ERA'].astype(float) * df_pit['IP'],
+        WHIP_x_w=df_pit['WHIP'].astype(float) * df_pit['IP'],
+    )
+    pit = pit.groupby(TEAM_KEYS, observed=True).sum().reset_index()
+    pit = _weighted(pit, ['ERA', 'WHIP'], 'IP')
+
+    teams = bat.merge(pit, on=TEAM_KEYS, how='outer')
+    return teams.sort_values(TEAM_KEYS).reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_team_seasons():
+    return build_team_seasons(load_batters(), load_pitchers())
+
+
+def load_team_seasons():
+    return _load_team_seasons().copy(deep=False)
@@ -0,0 +1,119 @@
+"""遠端素材與資料的共用下載層：連線池 + 平行預先下載 + 本機磁碟快取。
+
+快取檔名為 sha256(url + 版本)，同一版本的素材下載一次就不再連網；
+可變動的資料 (GitHub 列表、短評 JSON) 以 max_age 決定多久重新下載，
+連不上網路時一律退回磁碟上的舊內容。
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.cache import ROOT_DIR
+
+ASSET_CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "assets")
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 20
+
+_lock = threading.Lock()
+_shared = {}
+
+
+def _session():
+    # 整個 process 共用一個 Session：連線留在 urllib3 的連線池 (本身是 thread-safe)，
+    # 下一次下載、下一個執行緒都能重複使用；這裡只發 GET，不會改動 Session 的設定
+    with _lock:
+        if "session" not in _shared:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _shared["session"] = s
+        return _shared["session"]
+
+
+def executor():
+    """下載共用的 thread pool，跟著 process 存活；各處的平行下載都丟到這裡。"""
+    with _lock:
+        if "executor" not in _shared:
+            _shared["executor"] = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="asset-fetch")
+        return _shared["executor"]
+
+
+class CachedResponse:
+    """requests.Response 的最小替身：status_code / content / json()。"""
+
+    def __init__(self, content, status_code=200, from_cache=False):
+        self.content = content
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def cache_path(url, version="", cache_dir=ASSET_CACHE_DIR):
+    digest = hashlib.sha256(f"{url}\n{version}".encode()).hexdigest()
+    return os.path.join(cache_dir, digest[:2], digest)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def fetch(url, version="", max_age=None, cache_dir=ASSET_CACHE_DIR, timeout=FETCH_TIMEOUT):
+    """回傳 CachedResponse；max_age=None 代表這個 (url, 版本) 的內容不會變。
+
+    非 200 的回應照樣回傳 (不寫入快取)，讓呼叫端自行處理；
+    網路錯誤時若磁碟上有舊內容就回傳舊內容，否則拋出例外。
+    """
+    path = cache_path(url, version, cache_dir)
+    cached = os.path.exists(path)
+    if cached and (max_age is None or time.time() - os.path.getmtime(path) < max_age):
+        with open(path, "rb") as f:
+            return CachedResponse(f.read(), from_cache=True)
+
+    try:
+        res = _session().get(url, timeout=timeout)
+    except requests.RequestException:
+        if not cached:
+            raise
+        with open(path, "rb") as f:
+            return CachedResponse(f.read(), from_cache=True)
+
+    if res.status_code == 200:
+        try:
+            _write(path, res.content)
+        except OSError as e:
+            print(f"素材快取寫入失敗: {e}")
+    elif cached:
+        with open(path, "rb") as f:
+            return CachedResponse(f.read(), from_cache=True)
+    return CachedResponse(res.content, res.status_code)
+
+
+def prefetch(urls, version="", max_age=None, cache_dir=ASSET_CACHE_DIR, wait=True):
+    """平行下載 urls 到磁碟快取，回傳 {url: CachedResponse 或 Exception}。
+
+    wait=False 時不等下載完成，直接回傳 {url: Future}。
+    """
+    def one(url):
+        try:
+            return fetch(url, version, max_age, cache_dir)
+        except Exception as e:
+            return e
+
+    pool = executor()
+    futures = {url: pool.submit(one, url) for url in dict.fromkeys(urls)}
+    if not wait:
+        return futures
+    return {url: f.result() for url, f in futures.items()}
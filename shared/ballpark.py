@@ -0,0 +1,207 @@
+"""像素棒球場的素材：背景與球員 sprite 打包成一張 atlas，並預先合成每種選取狀態的球場圖。
+
+atlas 以 ASSET_VER 為版本存在 .cache/ballpark/，之後啟動不必再下載或縮放任何素材。
+"""
+import html
+import json
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from shared.assets import executor, fetch as fetch_asset
+from shared.cache import ROOT_DIR
+
+BASE_URL = "https://raw.githubusercontent.com/ChewyChloe/cpbl-project/main/game"
+
+ASSET_VER = "2025-12-24-1"
+
+
+def v(url: str) -> str:
+    return f"{url}?v={ASSET_VER}"
+
+
+IMAGES = {
+    "BG": v(f"{BASE_URL}/playground.png"),
+    "P": v(f"{BASE_URL}/P.png"),
+    "C": v(f"{BASE_URL}/C.png"),
+    "1B": v(f"{BASE_URL}/1B.png"),
+    "2B": v(f"{BASE_URL}/2B.png"),
+    "3B": v(f"{BASE_URL}/3B.png"),
+    "SS": v(f"{BASE_URL}/SS.png"),
+    "LF": v(f"{BASE_URL}/LF.png"),
+    "CF": v(f"{BASE_URL}/CF.png"),
+    "RF": v(f"{BASE_URL}/RF.png"),
+    "Batter": v(f"{BASE_URL}/batter.png"),
+}
+
+FIELD_W = 800
+FIELD_H = 600
+SELECTED_SCALE = 1.3
+
+# 位置
+PLACEMENTS = {
+    "P": {"top": 0.57, "left": 0.40, "w": 135, "h": 135},
+    "C": {"top": 0.80, "left": 0.42, "w": 120, "h": 120},
+    "Batter": {"top": 0.70, "left": 0.37, "w": 135, "h": 135},
+    "1B": {"top": 0.55, "left": 0.63, "w": 135, "h": 135},
+    "2B": {"top": 0.38, "left": 0.52, "w": 110, "h": 110},
+    "3B": {"top": 0.58, "left": 0.22, "w": 135, "h": 135},
+    "SS": {"top": 0.40, "left": 0.32, "w": 80, "h": 80},
+    "LF": {"top": 0.28, "left": 0.15, "w": 135, "h": 135},
+    "CF": {"top": 0.18, "left": 0.40, "w": 135, "h": 135},
+    "RF": {"top": 0.32, "left": 0.70, "w": 135, "h": 135},
+}
+
+ATLAS_DIR = os.path.join(ROOT_DIR, ".cache", "ballpark")
+ATLAS_WIDTH = 1024
+# alpha 低於此值的像素視為透明，點到不算命中
+HIT_ALPHA = 32
+
+
+def fetch_image(url: str) -> Image.Image:
+    # 素材以 ASSET_VER 為版本存進磁碟快取；換版本才會重新下載
+    r = fetch_asset(url, version=ASSET_VER)
+    if r.status_code != 200:
+        raise RuntimeError(f"素材下載失敗 ({r.status_code}): {url}")
+    return Image.open(BytesIO(r.content)).convert("RGBA")
+
+
+def sprite_size(role, selected=False):
+    p = PLACEMENTS[role]
+    scale = SELECTED_SCALE if selected else 1.0
+    return int(p["w"] * scale), int(p["h"] * scale)
+
+
+def sprite_origin(role):
+    p = PLACEMENTS[role]
+    return int(p["left"] * FIELD_W), int(p["top"] * FIELD_H)
+
+
+def build_atlas(fetch=fetch_image):
+    """下載所有素材並縮放成最終尺寸 (每個角色一般 + 放大兩種)，排進同一張圖。
+
+    回傳 (atlas 圖, {key: (x, y, w, h)})；key 為 "BG"、"P"、"P@sel" ...
+    """
+    # 11 張素材同時下載，不再一張接一張等
+    sources = dict(zip(IMAGES, executor().map(fetch, IMAGES.values())))
+
+    tiles = {"BG": sources["BG"].resize((FIELD_W, FIELD_H))}
+    for role in PLACEMENTS:
+        sprite = sources[role]
+        tiles[role] = sprite.resize(sprite_size(role))
+        tiles[f"{role}@sel"] = sprite.resize(sprite_size(role, selected=True))
+
+    # shelf packing：由左到右排，超過寬度就換行
+    rects, x, y, shelf = {}, 0, 0, 0
+    width = max(ATLAS_WIDTH, FIELD_W)
+    for key, tile in tiles.items():
+        w, h = tile.size
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        rects[key] = (x, y, w, h)
+        x, shelf = x + w, max(shelf, h)
+
+    atlas = Image.new("RGBA", (width, y + shelf), (0, 0, 0, 0))
+    for key, (x, y, _, _) in rects.items():
+        atlas.paste(tiles[key], (x, y))
+    return atlas, rects
+
+
+def save_atlas(atlas, rects, path=ATLAS_DIR):
+    os.makedirs(path, exist_ok=True)
+    atlas.save(os.path.join(path, f"atlas-{ASSET_VER}.png"))
+    with open(os.path.join(path, f"atlas-{ASSET_VER}.json"), "w", encoding="utf-8") as f:
+        json.dump(rects, f)
+
+
+def load_atlas(path=ATLAS_DIR, fetch=fetch_image):
+    png = os.path.join(path, f"atlas-{ASSET_VER}.png")
+    meta = os.path.join(path, f"atlas-{ASSET_VER}.json")
+    if os.path.exists(png) and os.path.exists(meta):
+        with open(meta, encoding="utf-8") as f:
+            rects = {k: tuple(r) for k, r in json.load(f).items()}
+        return Image.open(png).convert("RGBA"), rects
+
+    atlas, rects = build_atlas(fetch)
+    try:
+        save_atlas(atlas, rects, path)
+    except OSError as e:
+        print(f"atlas 寫入失敗: {e}")
+    return atlas, rects
+
+
+def _tile(atlas, rects, key):
+    x, y, w, h = rects[key]
+    return atlas.crop((x, y, x + w, y + h))
+
+
+class HitMap:
+    """逐像素的角色遮罩：mask[y, x] 為該點最上層 (最後畫上) 且不透明的 sprite 編號，0 為空地。"""
+
+    def __init__(self, mask, roles):
+        self.mask = mask
+        self.roles = roles
+
+    def role_at(self, x, y):
+        h, w = self.mask.shape
+        if not (0 <= x < w and 0 <= y < h):
+            return None
+        i = self.mask[y, x]
+        return self.roles[i - 1] if i else None
+
+
+def compose_field(atlas, rects, selected_role=None):
+    """合成球場畫面並同時建立 HitMap；sprite 依 PLACEMENTS 順序疊上，後畫的在上層。"""
+    field = _tile(atlas, rects, "BG")
+    roles = list(PLACEMENTS)
+    mask = np.zeros((field.height, field.width), dtype=np.uint8)
+    for i, role in enumerate(roles, 1):
+        key = f"{role}@sel" if role == selected_role else role
+        sprite = _tile(atlas, rects, key)
+        x, y = sprite_origin(role)
+        field.alpha_composite(sprite, (x, y))
+
+        # sprite 可能超出球場邊界，只取重疊的部分
+        opaque = np.asarray(sprite)[..., 3] >= HIT_ALPHA
+        h, w = min(opaque.shape[0], field.height - y), min(opaque.shape[1], field.width - x)
+        mask[y:y + h, x:x + w][opaque[:h, :w]] = i
+    return field, HitMap(mask, roles)
+
+
+class EncodedImage:
+    """已編碼好的 PNG；提供 save() 讓 streamlit_image_coordinates 直接寫出，不必每次重新編碼。"""
+
+    def __init__(self, image):
+        buf = BytesIO()
+        image.save(buf, format="PNG")
+        self.png = buf.getvalue()
+        self.size = image.size
+
+    def save(self, fp, format=None, **kwargs):
+        fp.write(self.png)
+
+
+def build_field_states(atlas, rects):
+    # 未選取 + 每個角色被選取，共 len(PLACEMENTS) + 1 種畫面，各自附上對應的 HitMap
+    states = {}
+    for role in [None, *PLACEMENTS]:
+        field, hit_map = compose_field(atlas, rects, role)
+        states[role] = (EncodedImage(field), hit_map)
+    return states
+
+
+# 對話框打字效果：整段文字一次送出，由瀏覽器依 animation-delay 逐字顯示 (CSS 在頁面的 .rpg-char)
+TYPE_DELAY = 0.04
+
+
+def dialogue_html(text, animate=False):
+    if animate:
+        text = "".join(f'<span class="rpg-char" style="animation-delay:{i * TYPE_DELAY:.2f}s">{html.escape(ch)}</span>'
+                       for i, ch in enumerate(text))
+    return f"""
+    <div class="rpg-box-container">
+        <div class="rpg-box-inner">{text}</div>
+    </div>
+    """
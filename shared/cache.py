@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "tables")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+# 清理邏輯改版時調高，讓舊快取全部失效
+CACHE_VERSION = 2
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def _table_path(name):
+    return os.path.join(CACHE_DIR, f"{name}.parquet")
+
+
+def _write_table(name, df):
+    tmp = _table_path(name) + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, _table_path(name))
+
+
+def _sources(source):
+    return source if isinstance(source, tuple) else (source,)
+
+
+def source_digest(source):
+    return "+".join(file_sha256(s) for s in _sources(source))
+
+
+def read_cached(names, digest=None):
+    """讀取 names 目前在磁碟上的表格；digest 不符或檔案缺漏時回傳 None。"""
+    entry = _read_manifest().get("+".join(names), {})
+    if digest is not None and entry.get("sha256") != digest:
+        return None
+    if entry.get("version") != CACHE_VERSION or not all(os.path.exists(_table_path(n)) for n in names):
+        return None
+    return tuple(pd.read_parquet(_table_path(n), memory_map=True) for n in names)
+
+
+def store_cached(names, source, tables):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for n, df in zip(names, tables):
+        _write_table(n, df)
+    manifest = _read_manifest()
+    manifest["+".join(names)] = {
+        "source": "+".join(os.path.relpath(s, ROOT_DIR) for s in _sources(source)),
+        "sha256": source_digest(source),
+        "version": CACHE_VERSION,
+    }
+    _write_manifest(manifest)
+
+
+def load_cached(names, source, builder, rebuild=False):
+    """讀取 source 清理後的表格；source 內容 hash 變了才重新執行 builder。
+
+    source 可為單一路徑或路徑 tuple (多個來源時任一變動都會重建)；
+    builder(source) 需回傳與 names 同順序的 DataFrame tuple。
+    """
+    if not rebuild:
+        try:
+            tables = read_cached(names, source_digest(source))
+            if tables is not None:
+                return tables
+        except Exception as e:
+            print(f"快取讀取失敗，重新建置: {e}")
+
+    tables = builder(source)
+    try:
+        store_cached(names, source, tables)
+    except Exception as e:
+        # 唯讀磁碟或缺少 pyarrow 時仍可使用記憶體中的表格
+        print(f"快取寫入失敗: {e}")
+    return tuple(tables)
@@ -0,0 +1,17 @@
+import os
+
+from shared.cache import ROOT_DIR
+
+# 球員卡牌頁的遠端素材；啟動時由 shared.prefetch 先下載到磁碟快取
+JSON_URL = "https://raw.githubusercontent.com/ChewyChloe/cpbl-project/refs/heads/main/player_commentary.json"
+COMMENTARY_URLS = (JSON_URL, JSON_URL.replace("/refs/heads/main/", "/main/"))
+# 短評在磁碟快取保留一小時；離線時依序退回快取、repo 內附的副本
+COMMENTARY_MAX_AGE = 3600
+LOCAL_COMMENTARY = os.path.join(ROOT_DIR, "player_commentary.json")
+
+PLAYER_PHOTOS = {
+    '江坤宇': 'https://imgcdn.cna.com.tw/www/WebPhotos/800/20241001/824x1024_wmkn_0_C20241001000234.jpg',
+    '林立': 'https://img.ltn.com.tw/Upload/sports/page/800/2023/12/22/120.jpg',
+    '陳冠宇': 'https://hips.hearstapps.com/hmg-prod/images/pitcher-chen-kuan-yu-of-chinese-taipei-reacts-at-the-end-of-news-photo-1732522777.jpg',
+    '陳傑憲': 'https://img.ltn.com.tw/Upload/sports/page/800/2025/06/04/121.jpg'
+}
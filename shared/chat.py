@@ -0,0 +1,80 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+CHAT_MODEL = "gemini-2.5-flash"
+CACHE_MAX_ENTRIES = 256
+CACHE_TTL_SECONDS = 6 * 60 * 60
+
+_TRAILING_PUNCT = "?？!！。.～~ "
+
+
+def normalize_prompt(text):
+    # 全形/半形、大小寫、多餘空白與句尾標點不同視為同一個問題
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(_TRAILING_PUNCT)
+
+
+class ResponseCache:
+    """(知識庫版本, 正規化問題) -> 回答 的 LRU 快取，附 TTL 與命中率統計。
+
+    整個 server process 共用一份 (st.cache_resource)，因此以 lock 保護。
+    只做精確比對：「林立 2024」與「林立 2025」只差一個字，模糊比對容易答非所問。
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt, version):
+        return version, normalize_prompt(prompt)
+
+    def get(self, prompt, version):
+        key = self.key(prompt, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, prompt, version, answer):
+        if not answer:
+            return
+        with self._lock:
+            key = self.key(prompt, version)
+            self._entries[key] = (answer, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+def stream_answer(client, prompt, config, model=CHAT_MODEL):
+    # 逐段產生模型回覆文字，搭配 st.write_stream 讓第一段文字一到就顯示
+    for chunk in client.models.generate_content_stream(model=model, contents=prompt, config=config):
+        if chunk.text:
+            yield chunk.text
@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared.cache import ROOT_DIR, load_cached
+
+RAW_DATA_PATH = os.path.join(ROOT_DIR, "baseball_data.csv")
+PLAYER_FEATURES_PATH = os.path.join(ROOT_DIR, "player_features_for_app.csv")
+PITCHER_STATS_PATH = os.path.join(ROOT_DIR, "pitcher_stats_for_app.csv")
+STANDINGS_PATH = os.path.join(ROOT_DIR, "standings.csv")
+
+TEAM_NAME_MAP = {
+    '統一獅': '統一7-ELEVEn獅', '統一': '統一7-ELEVEn獅', 'Uni-Lions': '統一7-ELEVEn獅',
+    '桃猿': '樂天桃猿', 'Lamigo': '樂天桃猿', 'Rakuten': '樂天桃猿', '樂天': '樂天桃猿',
+    'Lamigo桃猿': '樂天桃猿', 'La New熊': '樂天桃猿',
+    '兄弟': '中信兄弟', '兄弟象': '中信兄弟', 'Brothers': '中信兄弟',
+    '富邦': '富邦悍將', '悍將': '富邦悍將', '義大': '富邦悍將', '義大犀牛': '富邦悍將',
+    '味全': '味全龍', 'Dragons': '味全龍',
+    '台鋼': '台鋼雄鷹', 'TSG': '台鋼雄鷹'
+}
+TARGET_TEAMS = ['統一7-ELEVEn獅', '台鋼雄鷹', '中信兄弟', '樂天桃猿', '味全龍', '富邦悍將']
+
+# 原始欄位 -> 表格欄位
+BAT_COLUMNS = {
+    'bat_PA': 'PA', 'bat_AB': 'AB', 'bat_R': 'R', 'bat_H': 'H', 'bat_1B': '1B',
+    'bat_2B': '2B', 'bat_3B': '3B', 'bat_HR': 'HR', 'bat_RBI': 'RBI',
+    'bat_SB': 'SB', 'bat_CS': 'CS', 'bat_BB': 'BB', 'bat_IBB': 'IBB',
+    'bat_HBP': 'HBP', 'bat_SF': 'SF', 'bat_SH': 'SH', 'bat_SO': 'SO',
+    'bat_GIDP': 'GIDP', 'bat_AVG': 'AVG', 'bat_OBP': 'OBP', 'bat_SLG': 'SLG',
+    'bat_OPS': 'OPS'
+}
+PIT_COLUMNS = {
+    'pit_IP': 'IP', 'pit_ER': 'ER', 'pit_BB': 'BB', 'pit_H': 'H', 'pit_SO': 'SO',
+    'pit_W': 'W', 'pit_L': 'L', 'pit_HR': 'HR', 'pit_HBP': 'HBP', 'pit_IBB': 'IBB',
+    'pit_BF': 'BF', 'pit_FO': 'FO', 'pit_ERA': 'ERA', 'pit_WHIP': 'WHIP'
+}
+KEY_COLUMNS = ['Name', 'Team', 'Year']
+
+
+RAW_COLUMNS = set(BAT_COLUMNS) | set(PIT_COLUMNS) | {'Name_clean', 'Team Name_x', 'Team Name_y', 'Year'}
+
+
+def read_raw(path=RAW_DATA_PATH):
+    # 只讀取會用到的欄位
+    return prepare_raw(pd.read_csv(path, usecols=lambda c: c in RAW_COLUMNS))
+
+
+def prepare_raw(df):
+    # 數值欄一次轉型
+    df = df[[c for c in df.columns if c in RAW_COLUMNS]].copy()
+    for col in list(BAT_COLUMNS) + list(PIT_COLUMNS):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # 一壘安打 (1B) = H - 2B - 3B - HR
+    df['bat_1B'] = df['bat_H'] - df['bat_2B'] - df['bat_3B'] - df['bat_HR']
+    return df
+
+
+def _finalize(df, team_col, stat_columns):
+    df = df.rename(columns={'Name_clean': 'Name', team_col: 'Team', **stat_columns})
+    df['Team'] = df['Team'].replace(TEAM_NAME_MAP)
+    df = df[df['Team'].isin(TARGET_TEAMS)]
+
+    stats = [c for c in stat_columns.values() if c in df.columns]
+    df = df[KEY_COLUMNS + stats].reset_index(drop=True)
+    df['Name'] = df['Name'].astype('category')
+    df['Team'] = pd.Categorical(df['Team'], categories=TARGET_TEAMS)
+    df['Year'] = df['Year'].astype(np.int16)
+    df[stats] = df[stats].astype(np.float32)
+    return df
+
+
+def build_batters(raw):
+    df = raw.sort_values(by=['Year', 'bat_PA'], ascending=[False, False])
+    df = df.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df = _finalize(df, 'Team Name_x', BAT_COLUMNS)
+    return df[df['PA'] > 0].reset_index(drop=True)
+
+
+def build_pitchers(raw):
+    df = raw[(raw['pit_IP'] > 0) & (raw['bat_PA'] < 10)].copy()
+
+    ip = df['pit_IP'].replace(0, 0.1)
+    df['pit_ERA'] = (df['pit_ER'] * 9) / ip
+    df['pit_WHIP'] = (df['pit_BB'] + df['pit_H']) / ip
+
+    df = df.sort_values(by=['Year', 'pit_IP'], ascending=[False, False])
+    df = df.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df['Team Name_y'] = df['Team Name_y'].fillna('Unknown')
+    return _finalize(df, 'Team Name_y', PIT_COLUMNS)
+
+
+def build_tables(path=RAW_DATA_PATH):
+    return build_tables_from(read_raw(path))
+
+
+def build_tables_from(raw):
+    return build_batters(raw), build_pitchers(raw)
+
+
+def update_tables(tables, raw, years):
+    # 只重建 years 這幾季，其餘年度沿用既有表格 (排序規則與 build_batters / build_pitchers 相同)
+    part = raw[raw['Year'].isin(years)]
+    out = []
+    for old, new, sort_col in zip(tables, build_tables_from(part), ('PA', 'IP')):
+        kept = old[~old['Year'].isin(years)]
+        df = pd.concat([kept.astype({'Name': str}), new.astype({'Name': str})], ignore_index=True)
+        df = df.sort_values(['Year', sort_col], ascending=[False, False], kind='stable').reset_index(drop=True)
+        df['Name'] = df['Name'].astype('category')
+        df['Team'] = pd.Categorical(df['Team'], categories=TARGET_TEAMS)
+        out.append(df)
+    return tuple(out)
+
+
+# 預測頁面用的模型特徵表
+def build_app_table(path):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    return (df,)
+
+
+CACHED_TABLES = {
+    ('batters', 'pitchers'): (RAW_DATA_PATH, build_tables),
+    ('player_features',): (PLAYER_FEATURES_PATH, build_app_table),
+    ('pitcher_stats',): (PITCHER_STATS_PATH, build_app_table),
+    ('standings',): (STANDINGS_PATH, build_app_table),
+}
+
+
+def build_cache(rebuild=False):
+    for names, (source, builder) in CACHED_TABLES.items():
+        load_cached(names, source, builder, rebuild=rebuild)
+
+
+# 整個 server process 只載入一次；磁碟快取讓重啟後也不必重新解析 CSV
+@st.cache_resource(show_spinner=False)
+def _load_tables(names):
+    source, builder = CACHED_TABLES[names]
+    return load_cached(names, source, builder)
+
+
+def _get_table(names, index):
+    source = CACHED_TABLES[names][0]
+    if not os.path.exists(source):
+        st.error(f"找不到 '{os.path.basename(source)}'")
+        return pd.DataFrame()
+    # 每個頁面拿到的是淺層副本：新增/改名欄位不會影響共用的快取表格
+    return _load_tables(names)[index].copy(deep=False)
+
+
+def load_batters():
+    return _get_table(('batters', 'pitchers'), 0)
+
+
+def load_pitchers():
+    return _get_table(('batters', 'pitchers'), 1)
+
+
+def load_player_features():
+    return _get_table(('player_features',), 0)
+
+
+def load_pitcher_stats():
+    return _get_table(('pitcher_stats',), 0)
+
+
+def load_standings():
+    return _get_table(('standings',), 0)
+
+
+if __name__ == '__main__':
+    import sys
+    build_cache(rebuild='--rebuild' in sys.argv)
+    # 延遲匯入：sabermetrics 依賴本模組
+    from shared.sabermetrics import STATS_TABLES, build_stat_tables
+    load_cached(STATS_TABLES, (RAW_DATA_PATH, STANDINGS_PATH), build_stat_tables, rebuild='--rebuild' in sys.argv)
+    print(f"已建置快取: {', '.join(n for names in [*CACHED_TABLES, STATS_TABLES] for n in names)}")
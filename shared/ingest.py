@@ -0,0 +1,130 @@
+"""把增量資料 (新的球員賽季列或更新後的累計數據) 併入 baseball_data.csv。
+
+以 (ID, Year, 球隊) upsert，只重算受影響的賽季；其餘年度的快取表格原封不動。
+用法: python -m shared.ingest delta.csv [delta2.csv ...]
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from shared.cache import load_cached, read_cached, source_digest, store_cached
+from shared.data import RAW_DATA_PATH, STANDINGS_PATH, build_tables, prepare_raw, update_tables
+from shared.sabermetrics import STATS_TABLES, build_stat_tables, update_stat_tables
+
+RAW_TABLES = ('batters', 'pitchers')
+TEAM_KEY_COLUMNS = ['Team Name_x', 'Team Name_y']
+
+
+def _ratio(num, den):
+    num, den = num.to_numpy(dtype=float), den.to_numpy(dtype=float)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+# 比率欄位依序由累計數據推回 (後面的公式會用到前面的結果)；增量檔有提供的欄位不覆寫
+RATE_FORMULAS = {
+    'bat_1B': lambda d: d['bat_H'] - d['bat_2B'] - d['bat_3B'] - d['bat_HR'],
+    'bat_TB': lambda d: d['bat_H'] + d['bat_2B'] + 2 * d['bat_3B'] + 3 * d['bat_HR'],
+    'bat_AVG': lambda d: _ratio(d['bat_H'], d['bat_AB']),
+    'bat_OBP': lambda d: _ratio(d['bat_H'] + d['bat_BB'] + d['bat_HBP'],
+                                d['bat_AB'] + d['bat_BB'] + d['bat_HBP'] + d['bat_SF']),
+    'bat_SLG': lambda d: _ratio(d['bat_TB'], d['bat_AB']),
+    'bat_OPS': lambda d: d['bat_OBP'] + d['bat_SLG'],
+    'bat_ISO': lambda d: d['bat_SLG'] - d['bat_AVG'],
+    'bat_BB_percent': lambda d: _ratio(d['bat_BB'], d['bat_PA']),
+    'bat_K_percent': lambda d: _ratio(d['bat_SO'], d['bat_PA']),
+}
+
+
+def row_keys(df, team_cols=TEAM_KEY_COLUMNS):
+    # ID 缺漏或為 0 (如當季新進球員) 時改用名字，避免不同球員被視為同一列
+    ids = pd.to_numeric(df['ID'], errors='coerce') if 'ID' in df else pd.Series(np.nan, index=df.index)
+    pid = ids.astype('Int64').astype(str).where(ids.fillna(0) != 0, 'name:' + df['Name_clean'].astype(str).str.strip())
+    key = pid + '|' + df['Year'].astype(int).astype(str)
+    for col in team_cols:
+        key = key + '|' + df[col].fillna('').astype(str).str.strip()
+    return key
+
+
+def upsert_raw(raw, delta):
+    """回傳 (合併後的原始資料, 受影響的年份)。
+
+    增量列在原位置蓋過同一鍵值的既有列 (CSV 列順序不變)，新球員接在最後；
+    增量檔沒有的欄位沿用既有值，新球員則留空。
+    """
+    raw = raw.reset_index(drop=True)
+    unknown = [c for c in delta.columns if c not in raw.columns]
+    if unknown:
+        print(f"忽略原始資料沒有的欄位: {', '.join(unknown)}")
+
+    # 增量檔只給打擊或投手球隊時，就只用該欄比對
+    team_cols = [c for c in TEAM_KEY_COLUMNS if c in delta.columns]
+    if not team_cols:
+        raise ValueError(f"增量資料至少需要 {' / '.join(TEAM_KEY_COLUMNS)} 其中一欄")
+
+    keys = row_keys(raw, team_cols)
+    delta = delta.set_axis(row_keys(delta, team_cols)).drop(columns=unknown)
+    delta = delta[~delta.index.duplicated(keep='last')]
+
+    matched = keys.isin(delta.index)
+    base = raw[matched].set_axis(keys[matched])
+    rows = delta.combine_first(base[~base.index.duplicated()]).reindex(columns=raw.columns)
+
+    # 新球員沒給的累計數據視為 0
+    numeric = raw.select_dtypes('number').columns
+    rows[numeric] = rows[numeric].fillna(0).astype(raw.dtypes[numeric])
+    for col, formula in RATE_FORMULAS.items():
+        if col not in delta.columns:
+            rows[col] = formula(rows)
+
+    # 既有鍵值留在第一次出現的位置 (重複列併成一列)，其餘照原順序
+    first = matched & ~keys.duplicated()
+    updated = rows.loc[keys[first]].set_axis(raw.index[first])
+    added = rows[~rows.index.isin(keys[first])]
+    merged = pd.concat([raw[~matched], updated]).sort_index(kind='stable')
+    merged = pd.concat([merged, added], ignore_index=True)
+    return merged, sorted(int(y) for y in delta['Year'].unique())
+
+
+def _write_csv(df, path):
+    tmp = path + '.tmp'
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def ingest(delta_paths, raw_path=RAW_DATA_PATH, standings_path=STANDINGS_PATH):
+    stats_source = (raw_path, standings_path)
+    raw_digest, stats_digest = source_digest(raw_path), source_digest(stats_source)
+
+    # round_trip 讓未變動的列原樣寫回
+    raw = pd.read_csv(raw_path, low_memory=False, float_precision='round_trip')
+    years = set()
+    for path in delta_paths:
+        raw, changed = upsert_raw(raw, pd.read_csv(path))
+        years.update(changed)
+    _write_csv(raw, raw_path)
+
+    # 既有快取對應的是更新前的原始資料才能增量；否則 (首次建置、版本不符) 整份重建
+    prepared = prepare_raw(raw)
+    tables = read_cached(RAW_TABLES, raw_digest)
+    if tables is None:
+        load_cached(RAW_TABLES, raw_path, build_tables, rebuild=True)
+    else:
+        store_cached(RAW_TABLES, raw_path, update_tables(tables, prepared, years))
+
+    stats = read_cached(STATS_TABLES, stats_digest)
+    if stats is None:
+        load_cached(STATS_TABLES, stats_source, build_stat_tables, rebuild=True)
+        stats_years = sorted(years)
+    else:
+        *stats, stats_years = update_stat_tables(stats, prepared, pd.read_csv(standings_path), years)
+        store_cached(STATS_TABLES, stats_source, stats)
+    return sorted(years), stats_years
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit("用法: python -m shared.ingest delta.csv [delta2.csv ...]")
+    years, stats_years = ingest(sys.argv[1:])
+    print(f"已更新賽季: {years}；重算數據賽季: {stats_years}")
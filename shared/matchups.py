@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from shared.prediction import DEFAULT_FIP, lineup_wraa, win_probability
+from shared.rosters import PARK_FACTORS, STADIUM_MAP, TEAM_ROSTERS
+
+LINEUP_SIZE = 9
+
+
+def default_lineups(wraa_lookup, rosters=TEAM_ROSTERS):
+    # 各隊取預估 wRAA 最高的 9 人
+    def score(name):
+        return wraa_lookup.get(name.strip(), float('-inf'))
+
+    return {
+        team: sorted(r['batters'], key=score, reverse=True)[:LINEUP_SIZE]
+        for team, r in rosters.items()
+    }
+
+
+def league_matchups(meta_model, scaler, wraa_lookup, fip_lookup, lineups=None):
+    # 所有 主隊 x 客隊 x 雙方先發 x 主場球場 組合，scaler / meta_model 各只跑一次
+    lineups = lineups or default_lineups(wraa_lookup)
+    teams = list(STADIUM_MAP)
+    totals, _ = lineup_wraa(wraa_lookup, [lineups[t] for t in teams])
+    team_wraa = dict(zip(teams, totals))
+
+    starters = pd.DataFrame(
+        [(t, p, fip_lookup.get(p.strip(), DEFAULT_FIP)) for t in teams for p in TEAM_ROSTERS[t]['pitchers']],
+        columns=['Team', 'SP', 'FIP'],
+    )
+    parks = pd.DataFrame(
+        [(t, s, PARK_FACTORS[s]['Runs']) for t in teams for s in STADIUM_MAP[t]],
+        columns=['Team', 'Stadium', 'PF'],
+    )
+
+    home = starters.merge(parks, on='Team').rename(columns={'Team': 'Home', 'SP': 'Home_SP', 'FIP': 'Home_FIP'})
+    away = starters.rename(columns={'Team': 'Away', 'SP': 'Away_SP', 'FIP': 'Away_FIP'})
+    games = home.merge(away, how='cross')
+    games = games[games['Home'] != games['Away']].reset_index(drop=True)
+
+    games['wraa_diff'] = games['Home'].map(team_wraa) - games['Away'].map(team_wraa)
+    games['fip_diff'] = games['Away_FIP'] - games['Home_FIP']
+    games['Win_Prob'], games['Win_Prob_Raw'] = win_probability(
+        meta_model, scaler, games['wraa_diff'], games['fip_diff'], games['PF']
+    )
+    return games[['Home', 'Away', 'Stadium', 'Home_SP', 'Away_SP', 'wraa_diff', 'fip_diff', 'PF',
+                  'Win_Prob_Raw', 'Win_Prob']]
+
+
+def matchup_heatmap(games):
+    # 主隊 x 客隊 的平均勝率
+    return games.pivot_table(index='Home', columns='Away', values='Win_Prob', aggfunc='mean')
+
+
+def optimize_lineup(meta_model, scaler, roster, wraa_lookup, opp_wraa, fip_diff, park_factor,
+                    home=True, size=LINEUP_SIZE):
+    """從 roster 選出讓己隊勝率最高的 size 人打線。
+
+    fip_diff / park_factor 與單場預測相同，皆以主隊角度計算；home=False 時改為最大化客隊勝率。
+    先依 wRAA 貢獻貪婪選人，再把所有「先發 <-> 板凳」交換一次批次評分，直到沒有更好的交換。
+    """
+    contrib = np.array([wraa_lookup.get(n.strip(), 0.0) for n in roster])
+
+    def team_prob(totals):
+        wraa_diff = totals - opp_wraa if home else opp_wraa - totals
+        # 用未截斷的模型勝率比較，避免 0.95 上限造成平手
+        _, raw = win_probability(meta_model, scaler, wraa_diff, fip_diff, park_factor)
+        return raw if home else 1 - raw
+
+    chosen = list(np.argsort(-contrib, kind='stable')[:size])
+    best = team_prob(np.array([contrib[chosen].sum()]))[0]
+    while True:
+        bench = [i for i in range(len(roster)) if i not in chosen]
+        if not bench:
+            break
+        deltas = contrib[bench][None, :] - contrib[chosen][:, None]
+        probs = team_prob(contrib[chosen].sum() + deltas.ravel())
+        k = int(probs.argmax())
+        if probs[k] <= best + 1e-12:
+            break
+        best = probs[k]
+        i, j = divmod(k, len(bench))
+        chosen[i] = bench[j]
+
+    # 打序：貢獻高者在前
+    chosen.sort(key=lambda i: -contrib[i])
+    return [roster[i] for i in chosen]
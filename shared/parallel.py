@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from shared.simulation import simulate_seasons
+
+# worker 端狀態：由 initializer 設定一次，之後每個 task 只傳列範圍
+_worker = {}
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _limit_threads():
+    # 每個 process 只用一條執行緒，避免 16 個 worker 各自再開 16 條
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = '1'
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def _init_scorer(model_path, shm_name, shape, dtype, dtypes):
+    _limit_threads()
+    import joblib
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker['shm'] = shm
+    _worker['X'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker['dtypes'] = dtypes
+    _worker['model'] = joblib.load(model_path)
+
+
+def _score_rows(start, stop):
+    # 還原原本的欄位型別 (CatBoost 類別欄需要整數)
+    X = pd.DataFrame(_worker['X'][start:stop], columns=list(_worker['dtypes'])).astype(_worker['dtypes'])
+    return start, _worker['model'].predict(X)
+
+
+class ParallelScorer:
+    """把特徵矩陣放進 shared memory，每個 worker 只載入一次模型。
+
+    用法：
+        with ParallelScorer(MODEL_PATH, features, workers=16) as scorer:
+            preds = scorer.predict()
+    """
+
+    def __init__(self, model_path, features, workers=None, chunk_rows=2048):
+        self.model_path = model_path
+        self.workers = workers or default_workers()
+        self.chunk_rows = chunk_rows
+
+        values = np.ascontiguousarray(features.to_numpy(dtype=np.float64))
+        self.dtypes = {c: str(t) for c, t in features.dtypes.items()}
+        self.shape, self.dtype = values.shape, values.dtype
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)[:] = values
+
+        # spawn：避免 fork 一個已有多條執行緒的 Streamlit server
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_scorer,
+            initargs=(model_path, self._shm.name, self.shape, self.dtype, self.dtypes),
+        )
+
+    def predict(self):
+        n_rows = self.shape[0]
+        # 至少切成 worker 數量的份數，讓每個 core 都有工作
+        step = max(1, min(self.chunk_rows, -(-n_rows // self.workers)))
+        futures = [self._pool.submit(_score_rows, s, min(s + step, n_rows)) for s in range(0, n_rows, step)]
+
+        out = np.empty(n_rows)
+        for f in futures:
+            start, preds = f.result()
+            out[start:start + len(preds)] = preds
+        return out
+
+    def close(self):
+        self._pool.shutdown()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _simulate_chunk(p_home, n_seasons, seed):
+    _limit_threads()
+    return simulate_seasons(p_home, n_seasons, seed=seed)
+
+
+def parallel_simulate_seasons(p_home, n_seasons, seed=None, workers=None):
+    # 每個 worker 拿獨立的子亂數種子，結果依季數加權合併
+    workers = min(workers or default_workers(), n_seasons)
+    sizes = [n_seasons // workers + (i < n_seasons % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+        parts = list(pool.map(_simulate_chunk, [p_home] * workers, sizes, seeds))
+
+    return sum(part * (n / n_seasons) for part, n in zip(parts, sizes))
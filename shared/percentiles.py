@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared.data import load_batters, load_pitchers
+
+# 雷達圖各軸：欄位 -> 數值越高越好
+METRICS = {
+    'bat': {'AVG': True, 'OPS': True, 'HR': True, 'RBI': True, 'SB': True},
+    'pit': {'ERA': False, 'WHIP': False, 'SO': True, 'BB': False, 'IP': True},
+}
+# 規定打席 / 局數：只有達標的球員當作該年度的比較基準
+QUALIFY = {'bat': ('PA', 100), 'pit': ('IP', 30)}
+# 達標人數太少的年度 (例如資料不全的球季) 改以當年全部球員為基準
+MIN_REFERENCE = 10
+
+
+def percentile_table(df, role):
+    """與 df 同 index 的百分位表 (0~100，越高越好)，每列對應 df 同一列。
+
+    百分位以同年度達標球員為基準：(比他差的人數 + 同分人數 / 2) / 基準人數；
+    未達標的球員同樣套用這個基準，qualified 欄標示是否達標。
+    """
+    col, minimum = QUALIFY[role]
+    qualified = (df[col].astype(float) >= minimum).to_numpy()
+    years = df['Year'].to_numpy()
+    out = pd.DataFrame({'qualified': qualified}, index=df.index)
+
+    for stat, higher_is_better in METRICS[role].items():
+        values = df[stat].astype(float).to_numpy()
+        valid = ~np.isnan(values)
+        pct = np.full(len(df), np.nan)
+        for year in np.unique(years):
+            in_year = years == year
+            ref = in_year & valid & qualified
+            if ref.sum() < MIN_REFERENCE:
+                ref = in_year & valid
+            ref = np.sort(values[ref])
+            if len(ref) == 0:
+                continue
+            rows = in_year & valid
+            x = values[rows]
+            p = (np.searchsorted(ref, x, 'left') + np.searchsorted(ref, x, 'right')) / 2 / len(ref) * 100
+            pct[rows] = p if higher_is_better else 100 - p
+        out[stat] = pct
+    return out
+
+
+@st.cache_resource(show_spinner=False)
+def _load_percentile_tables():
+    return percentile_table(load_batters(), 'bat'), percentile_table(load_pitchers(), 'pit')
+
+
+def load_batter_percentiles():
+    return _load_percentile_tables()[0]
+
+
+def load_pitcher_percentiles():
+    return _load_percentile_tables()[1]
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared.data import load_batters, load_pitchers
+
+
+def normalize_name(name):
+    return str(name).strip()
+
+
+class PlayerIndex:
+    """球員名字 -> 各年度列位置 的索引，建一次後每次查詢 O(1)。
+
+    位置為 df 的第幾列 (iloc)，同一年度內維持原本列順序。
+    """
+
+    def __init__(self, df, name_col='Name', year_col='Year'):
+        self.df = df
+        names = df[name_col].astype(str).str.strip().to_numpy()
+        years = df[year_col].to_numpy()
+
+        self._rows = {}
+        order = np.lexsort((np.arange(len(df)), -years.astype(np.int64)))
+        for pos in order:
+            by_year = self._rows.setdefault(names[pos], {})
+            by_year.setdefault(int(years[pos]), []).append(int(pos))
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._rows
+
+    def names(self):
+        return list(self._rows)
+
+    def years(self, name):
+        # 新到舊
+        return list(self._rows.get(normalize_name(name), {}))
+
+    def positions(self, name, years=None):
+        by_year = self._rows.get(normalize_name(name), {})
+        return [p for y, rows in by_year.items() if years is None or y in years for p in rows]
+
+    def rows(self, name, years=None):
+        return self.df.iloc[self.positions(name, years)]
+
+    def latest(self, name, years=None):
+        positions = self.positions(name, years)
+        return self.df.iloc[positions[0]] if positions else None
+
+
+def build_roster(df_bat, df_pit, year=None, featured=()):
+    """每位球員一列 (Name, Year, Team, is_pitcher)：最新一季或指定球季。
+
+    投打都有時取較近的一季，同季以投手為準；featured 依序排最前面，其餘新到舊、依名字排。
+    """
+    seasons = pd.concat([
+        df_bat[['Name', 'Year', 'Team']].assign(is_pitcher=False),
+        df_pit[['Name', 'Year', 'Team']].assign(is_pitcher=True),
+    ], ignore_index=True)
+    seasons['Name'] = seasons['Name'].astype(str).str.strip()
+    if year is not None:
+        seasons = seasons[seasons['Year'] == year]
+
+    # 同季多列 (季中轉隊) 保留原本列順序的第一列，與 PlayerIndex.latest 一致
+    seasons = seasons.sort_values(['Year', 'is_pitcher'], ascending=False, kind='stable').drop_duplicates('Name')
+    rank = seasons['Name'].map({n: i for i, n in enumerate(featured)}).fillna(len(featured))
+    return (seasons.assign(rank=rank).sort_values(['rank', 'Year', 'Name'], ascending=[True, False, True], kind='stable')
+            .drop(columns='rank').reset_index(drop=True))
+
+
+def search_roster(roster, query):
+    query = str(query).strip().lower()
+    if not query:
+        return roster
+    hit = (roster['Name'].str.lower().str.contains(query, regex=False)
+           | roster['Team'].astype(str).str.lower().str.contains(query, regex=False))
+    return roster[hit]
+
+
+@st.cache_resource(show_spinner=False)
+def load_batter_index():
+    return PlayerIndex(load_batters())
+
+
+@st.cache_resource(show_spinner=False)
+def load_pitcher_index():
+    return PlayerIndex(load_pitchers())
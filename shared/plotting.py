@@ -0,0 +1,30 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+# 點數超過門檻改用 WebGL (scattergl)，瀏覽器不必為每個點建立 SVG 節點
+GL_THRESHOLD = 1000
+# 只替排名前 N 的點加上文字標籤，其餘靠 hover 顯示名字
+LABEL_TOP_N = 15
+
+
+def scatter(df, x, y, color=None, size=None, hover_name=None, label=None, label_by=None,
+            top_n=LABEL_TOP_N, **kwargs):
+    """px.scatter 的大資料版：自動切換 svg / webgl，label 欄只標 label_by 最高的 top_n 個點。
+
+    標籤放在獨立的純文字 trace，主要的點不帶 text 陣列；名字仍可從 hover 看到。
+    """
+    cols = list(dict.fromkeys(c for c in (x, y, color, size, hover_name) if c is not None))
+    data = df[cols].copy()
+    # 座標以 float32 送出 (base64 編碼時每個值 4 bytes)，畫圖用的精度足夠
+    for col in data.select_dtypes('float64').columns:
+        data[col] = data[col].astype('float32')
+
+    render_mode = 'webgl' if len(data) > GL_THRESHOLD else 'svg'
+    fig = px.scatter(data, x=x, y=y, color=color, size=size, hover_name=hover_name,
+                     render_mode=render_mode, **kwargs)
+
+    if label is not None and len(df):
+        top = df.loc[df[label_by or y].nlargest(top_n).index]
+        fig.add_trace(go.Scatter(x=top[x], y=top[y], text=top[label].astype(str), mode='text',
+                                 textposition='top center', hoverinfo='skip', showlegend=False))
+    return fig
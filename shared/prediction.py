@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from shared.cache import ROOT_DIR
+from shared.players import PlayerIndex
+
+MODEL_PATH = os.path.join(ROOT_DIR, "cpbl_ai_model.pkl")
+WRAA_TABLE_PATH = os.path.join(ROOT_DIR, "player_wraa.csv")
+
+PREDICT_YEARS = [2024, 2025]
+# 最近一季權重 0.7，前一季 0.3；只有一季時權重為 1
+SEASON_WEIGHTS = [0.7, 0.3]
+META_COLUMNS = ['Name_Display', 'Team_Display', 'Year_Display', 'Real_OPS']
+
+# 主場邏輯修正與勝率上下限
+HOME_ADJUSTMENT = 0.33
+WIN_PROB_CLIP = (0.05, 0.95)
+DEFAULT_FIP = 4.2
+
+
+def model_feature_order(model):
+    first_est = model.estimators_[0]
+    return first_est.feature_names_ if hasattr(first_est, 'feature_names_') else first_est.feature_names_in_
+
+
+def build_feature_matrix(df_bat, expected_order):
+    # 整張表只對齊、轉型一次
+    feat = df_bat.drop(columns=META_COLUMNS, errors='ignore')
+    feat = feat.reindex(columns=list(expected_order), fill_value=0)
+    return feat.apply(pd.to_numeric, errors='coerce').fillna(0)
+
+
+def build_player_index(df_bat, years=PREDICT_YEARS):
+    # 名字 -> 近兩季的列位置 (新到舊)
+    index = PlayerIndex(df_bat, 'Name_Display', 'Year_Display')
+    positions = {name: index.positions(name, years)[:len(SEASON_WEIGHTS)] for name in index.names()}
+    return {name: rows for name, rows in positions.items() if rows}
+
+
+def predict_team_wraa(model, features, player_index, lineups):
+    # 所有打線的球員季度組成一個矩陣，只呼叫一次 predict
+    rows, weights, owners, found = [], [], [], []
+    for team_i, names in enumerate(lineups):
+        found.append([])
+        for name in names:
+            positions = player_index.get(name.strip())
+            if not positions:
+                continue
+            found[team_i].append(name)
+            w = np.asarray(SEASON_WEIGHTS[:len(positions)])
+            rows.extend(positions)
+            weights.extend(w / w.sum())
+            owners.extend([team_i] * len(positions))
+
+    totals = np.zeros(len(lineups))
+    if rows:
+        preds = model.predict(features.iloc[rows])
+        np.add.at(totals, owners, preds * np.asarray(weights))
+    return totals, found
+
+
+def build_wraa_table(model, df_bat, years=PREDICT_YEARS, workers=1):
+    # 每位球員近兩季一次評分完，存成 Name -> 各季 / 加權 wRAA
+    features = build_feature_matrix(df_bat, model_feature_order(model))
+    index = build_player_index(df_bat, years)
+    names = sorted(index)
+    positions = [p for n in names for p in index[n]]
+
+    if workers > 1:
+        from shared.parallel import ParallelScorer
+        with ParallelScorer(MODEL_PATH, features.iloc[positions], workers=workers) as scorer:
+            preds = scorer.predict()
+    else:
+        preds = model.predict(features.iloc[positions])
+
+    seasons = pd.DataFrame({
+        'Name': [n for n in names for _ in index[n]],
+        'Year': df_bat['Year_Display'].to_numpy()[positions],
+        'wRAA': preds,
+        'weight': np.concatenate([
+            np.asarray(SEASON_WEIGHTS[:len(index[n])]) / sum(SEASON_WEIGHTS[:len(index[n])]) for n in names
+        ]),
+    })
+
+    table = seasons.pivot(index='Name', columns='Year', values='wRAA').reindex(index=names, columns=years)
+    table.columns = [f'wRAA_{y}' for y in years]
+    table['wRAA'] = (seasons['wRAA'] * seasons['weight']).groupby(seasons['Name']).sum()
+    return table.reset_index()
+
+
+def load_wraa_lookup(path=WRAA_TABLE_PATH):
+    table = pd.read_csv(path)
+    return dict(zip(table['Name'].astype(str).str.strip(), table['wRAA']))
+
+
+def lineup_wraa(wraa_lookup, lineups):
+    totals, found = [], []
+    for names in lineups:
+        hits = [n for n in names if n.strip() in wraa_lookup]
+        totals.append(sum(wraa_lookup[n.strip()] for n in hits))
+        found.append(hits)
+    return np.array(totals), found
+
+
+def build_fip_lookup(df_pit):
+    # 名字 -> 最新一季 FIP
+    name_col = 'Name' if 'Name' in df_pit.columns else 'Name_Display'
+    index = PlayerIndex(df_pit, name_col, 'Year')
+    return {name: index.latest(name)['FIP'] for name in index.names()}
+
+
+def win_probability(meta_model, scaler, wraa_diff, fip_diff, park_factor):
+    # 可一次處理整批對戰；回傳 (修正後勝率, 模型原始勝率)
+    X_raw = np.column_stack(np.broadcast_arrays(
+        np.asarray(wraa_diff, dtype=float), np.asarray(fip_diff, dtype=float), np.asarray(park_factor, dtype=float)
+    ))
+    win_prob_raw = meta_model.predict_proba(scaler.transform(X_raw))[:, 1]
+
+    logit_final = np.log(win_prob_raw / (1 - win_prob_raw)) + HOME_ADJUSTMENT
+    win_prob = 1 / (1 + np.exp(-logit_final))
+    return np.clip(win_prob, *WIN_PROB_CLIP), win_prob_raw
+
+
+if __name__ == '__main__':
+    import argparse
+    import joblib
+    from shared.data import PLAYER_FEATURES_PATH, build_app_table
+
+    parser = argparse.ArgumentParser(description="預先計算球員 wRAA 表")
+    parser.add_argument('--workers', type=int, default=1, help="平行評分的 process 數")
+    args = parser.parse_args()
+
+    (df_features,) = build_app_table(PLAYER_FEATURES_PATH)
+    table = build_wraa_table(joblib.load(MODEL_PATH), df_features, workers=args.workers)
+    table.to_csv(WRAA_TABLE_PATH, index=False)
+    print(f"已輸出 {len(table)} 位球員的 wRAA 至 {os.path.basename(WRAA_TABLE_PATH)}")
@@ -0,0 +1,23 @@
+"""App 啟動時在背景預先下載各頁會用到的遠端素材，使用者點進頁面時多半已在磁碟快取裡。"""
+import streamlit as st
+
+from shared.assets import prefetch
+from shared.ballpark import ASSET_VER, IMAGES
+from shared.cards import COMMENTARY_MAX_AGE, JSON_URL, PLAYER_PHOTOS
+from shared.rag import GITHUB_API_URL, GITHUB_MAX_AGE
+
+
+def prefetch_all(wait=False):
+    """球場 sprite、球員短評、卡牌照片、GitHub 知識庫列表；各自沿用頁面讀取時的版本與 max_age。"""
+    futures = {}
+    futures.update(prefetch(IMAGES.values(), ASSET_VER, wait=wait))
+    futures.update(prefetch([JSON_URL], max_age=COMMENTARY_MAX_AGE, wait=wait))
+    futures.update(prefetch(PLAYER_PHOTOS.values(), wait=wait))
+    futures.update(prefetch([GITHUB_API_URL], max_age=GITHUB_MAX_AGE, wait=wait))
+    return futures
+
+
+@st.cache_resource(show_spinner=False)
+def start_prefetch():
+    # 每個 process 只啟動一次；不等下載完成，頁面照常繪製
+    return prefetch_all(wait=False)
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.assets import fetch as fetch_asset
+from shared.cache import ROOT_DIR
+
+GITHUB_USER = "ChewyChloe"
+GITHUB_REPO = "cpbl-project"
+GITHUB_FOLDER = "AI_RAG"
+GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{GITHUB_FOLDER}"
+TARGET_STORE_NAME = "CPBL_Scout_Knowledge_v6"
+
+# 已上傳到知識庫的文件：{store 名稱: {檔名: {"sha": GitHub blob sha, "document": store 內文件名稱}}}
+RAG_MANIFEST_PATH = os.path.join(ROOT_DIR, ".cache", "rag_manifest.json")
+# 本機檢索用的文件副本；repo 根目錄有 AI_RAG/ 時優先使用 (可完全離線)
+LOCAL_DOCS_DIR = os.path.join(ROOT_DIR, GITHUB_FOLDER)
+MIRROR_DOCS_DIR = os.path.join(ROOT_DIR, ".cache", "rag_docs")
+UPLOAD_WORKERS = 4
+UPLOAD_POLL_INTERVAL = 2
+UPLOAD_TIMEOUT = 300
+# GitHub 列表與文件在磁碟快取保留的秒數；過期才重新下載，連不上時沿用舊內容
+GITHUB_MAX_AGE = 600
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".txt": "text/plain",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def read_manifest(path=RAG_MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(manifest, path=RAG_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def fetch_github(url):
+    return fetch_asset(url, max_age=GITHUB_MAX_AGE)
+
+
+def doc_extension(name):
+    return os.path.splitext(name.lower())[1]
+
+
+def list_remote_docs(fetch=fetch_github, url=GITHUB_API_URL):
+    # GitHub contents API 已附上每個檔案的 blob sha，不必下載就能判斷是否變動
+    res = fetch(url)
+    if res.status_code != 200:
+        raise RuntimeError(f"GitHub 列表失敗: HTTP {res.status_code}")
+    return {
+        f['name']: {'sha': f['sha'], 'download_url': f['download_url']}
+        for f in res.json()
+        if doc_extension(f['name']) in MIME_TYPES
+    }
+
+
+def find_or_create_store(client, display_name=TARGET_STORE_NAME):
+    try:
+        for s in client.file_search_stores.list():
+            if s.display_name == display_name:
+                return s
+    except Exception:
+        pass
+    return client.file_search_stores.create(config={'display_name': display_name})
+
+
+def _existing_display_names(client, store_name):
+    # store 內現有文件：{顯示名稱: 文件名稱}；列表失敗就讓例外往上拋，不要當成空的 store 全部重傳
+    return {d.display_name: d.name for d in client.file_search_stores.documents.list(parent=store_name)}
+
+
+def _wait(client, op):
+    # 上傳是長時間作業：完成前 response 還沒有文件名稱
+    deadline = time.monotonic() + UPLOAD_TIMEOUT
+    while not op.done:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"上傳逾時: {op.name}")
+        time.sleep(UPLOAD_POLL_INTERVAL)
+        op = client.operations.get(op)
+    if op.error:
+        raise RuntimeError(f"上傳失敗: {op.error}")
+    return op
+
+
+def _upload(client, store_name, name, doc, fetch):
+    res = fetch(doc['download_url'])
+    if res.status_code != 200 or not res.content:
+        raise RuntimeError(f"下載失敗: HTTP {res.status_code}")
+
+    ext = doc_extension(name)
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as f:
+        f.write(res.content)
+    try:
+        op = client.file_search_stores.upload_to_file_search_store(
+            file=f.name,
+            file_search_store_name=store_name,
+            config={'display_name': name, 'mime_type': MIME_TYPES[ext]},
+        )
+    finally:
+        os.remove(f.name)
+    op = _wait(client, op)
+    return getattr(op.response, 'document_name', None)
+
+
+def _delete(client, document):
+    if not document:
+        return
+    try:
+        client.file_search_stores.documents.delete(name=document, config={'force': True})
+    except Exception as e:
+        print(f"刪除舊文件失敗: {e}")
+
+
+def sync_store(client, store_name, remote_docs, manifest_path=RAG_MANIFEST_PATH, fetch=fetch_github,
+               workers=UPLOAD_WORKERS):
+    """依 manifest 與遠端清單的差異同步知識庫：只上傳新增/變動的檔案，並移除已刪除的檔案。
+
+    manifest 裡沒有這個 store 時 (第一次執行或快取被清掉)，store 內已存在的同名文件視為最新，
+    不重新上傳。回傳 {"uploaded": [...], "deleted": [...], "failed": {檔名: 錯誤}}。
+    """
+    manifest = read_manifest(manifest_path)
+    if store_name not in manifest:
+        existing = _existing_display_names(client, store_name)
+        manifest[store_name] = {
+            name: {'sha': doc['sha'], 'document': existing[name]}
+            for name, doc in remote_docs.items() if name in existing
+        }
+    synced = manifest[store_name]
+
+    changed = [n for n, doc in remote_docs.items() if synced.get(n, {}).get('sha') != doc['sha']]
+    removed = [n for n in synced if n not in remote_docs]
+
+    failed = {}
+    if changed:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {n: pool.submit(_upload, client, store_name, n, remote_docs[n], fetch) for n in changed}
+        for name, fut in futures.items():
+            try:
+                document = fut.result()
+            except Exception as e:
+                failed[name] = str(e)
+                continue
+            # 新版上傳成功後才移除舊版，失敗時知識庫仍保有舊內容
+            if name in synced:
+                _delete(client, synced[name].get('document'))
+            synced[name] = {'sha': remote_docs[name]['sha'], 'document': document}
+
+    for name in removed:
+        _delete(client, synced.pop(name).get('document'))
+
+    write_manifest(manifest, manifest_path)
+    return {'uploaded': [n for n in changed if n not in failed], 'deleted': removed, 'failed': failed}
+
+
+def mirror_remote_docs(remote_docs, dest=MIRROR_DOCS_DIR, fetch=fetch_github):
+    # 把 GitHub 上的文件同步到本機資料夾，只下載 sha 變動的檔案
+    os.makedirs(dest, exist_ok=True)
+    index_path = os.path.join(dest, "index.json")
+    index = read_manifest(index_path)
+    for name, doc in remote_docs.items():
+        path = os.path.join(dest, name)
+        if index.get(name) == doc['sha'] and os.path.exists(path):
+            continue
+        res = fetch(doc['download_url'])
+        if res.status_code == 200 and res.content:
+            with open(path, "wb") as f:
+                f.write(res.content)
+            index[name] = doc['sha']
+    for name in [n for n in index if n not in remote_docs]:
+        index.pop(name)
+        if os.path.exists(os.path.join(dest, name)):
+            os.remove(os.path.join(dest, name))
+    write_manifest(index, index_path)
+    return dest
+
+
+def store_version(store_name, manifest_path=RAG_MANIFEST_PATH):
+    # 知識庫內容的指紋：任一文件新增/變動/刪除都會改變，用於讓舊的回答快取失效
+    synced = read_manifest(manifest_path).get(store_name, {})
+    digest = hashlib.sha256(json.dumps(sorted((n, d['sha']) for n, d in synced.items())).encode())
+    return digest.hexdigest()[:16]
+
+
+def initialize_rag(client, manifest_path=RAG_MANIFEST_PATH, fetch=fetch_github):
+    try:
+        store = find_or_create_store(client)
+    except Exception as e:
+        print(f"建立 Store 失敗: {e}")
+        return None
+
+    try:
+        result = sync_store(client, store.name, list_remote_docs(fetch), manifest_path, fetch)
+        for name, err in result['failed'].items():
+            print(f"上傳失敗 {name}: {err}")
+    except Exception as e:
+        # GitHub 無法連線時沿用 store 現有內容
+        print(f"GitHub 同步錯誤: {e}")
+    return store.name
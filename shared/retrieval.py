@@ -0,0 +1,235 @@
+"""本機 BM25 檢索：球探文件、球員短評與球員數據表，不經過遠端 file-search store。
+
+索引存成 .npy (memory-mapped 讀取) + meta.json，來源內容 hash 不變時直接載入。
+"""
+import hashlib
+import json
+import os
+import re
+import zipfile
+from collections import Counter
+
+import numpy as np
+import streamlit as st
+
+from shared.cache import ROOT_DIR, file_sha256
+from shared.data import RAW_DATA_PATH, load_batters, load_pitchers
+from shared.rag import LOCAL_DOCS_DIR, MIRROR_DOCS_DIR, MIME_TYPES, doc_extension, list_remote_docs, mirror_remote_docs
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+COMMENTARY_PATH = os.path.join(ROOT_DIR, "player_commentary.json")
+INDEX_DIR = os.path.join(ROOT_DIR, ".cache", "retrieval")
+INDEX_VERSION = 1
+
+CHUNK_CHARS = 400
+CHUNK_OVERLAP = 80
+TOP_K = 5
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def tokenize(text):
+    # 中文沒有空白斷詞：取單字 + 相鄰兩字；英數字整段當一個詞
+    text = str(text).lower()
+    tokens = _WORD.findall(text)
+    for run in _CJK_RUN.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= size:
+        return [text] if text else []
+    step = size - overlap
+    return [text[i:i + size] for i in range(0, len(text) - overlap, step)]
+
+
+def read_document(path):
+    ext = doc_extension(path)
+    if ext == ".txt":
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    if ext == ".docx":
+        with zipfile.ZipFile(path) as z:
+            xml = z.read("word/document.xml").decode("utf-8", errors="ignore")
+        return re.sub(r"<[^>]+>", "", xml.replace("</w:p>", "\n"))
+    if ext == ".pdf" and PdfReader is not None:
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    return ""
+
+
+def _doc_paths(docs_dirs):
+    # 同名文件以先列出的資料夾為準
+    paths = {}
+    for d in docs_dirs:
+        if os.path.isdir(d):
+            for name in sorted(os.listdir(d)):
+                if doc_extension(name) in MIME_TYPES and name not in paths:
+                    paths[name] = os.path.join(d, name)
+    return paths
+
+
+def stat_passages(df_bat, df_pit):
+    passages = []
+    for r in df_bat.itertuples(index=False):
+        passages.append({
+            'id': f"bat:{r.Name}:{r.Year}",
+            'text': f"{r.Name} {r.Year} 年 {r.Team} 打擊成績：{r.PA:.0f} 打席，打擊率 {r.AVG:.3f}，"
+                    f"上壘率 {r.OBP:.3f}，長打率 {r.SLG:.3f}，OPS {r.OPS:.3f}，全壘打 {r.HR:.0f} 支，"
+                    f"打點 {r.RBI:.0f}，盜壘 {r.SB:.0f}，三振 {r.SO:.0f}，四壞 {r.BB:.0f}。",
+        })
+    for r in df_pit.itertuples(index=False):
+        passages.append({
+            'id': f"pit:{r.Name}:{r.Year}",
+            'text': f"{r.Name} {r.Year} 年 {r.Team} 投球成績：{r.IP:.1f} 局，防禦率 {r.ERA:.2f}，"
+                    f"WHIP {r.WHIP:.2f}，{r.W:.0f} 勝 {r.L:.0f} 敗，三振 {r.SO:.0f}，四壞 {r.BB:.0f}，"
+                    f"被全壘打 {r.HR:.0f}。",
+        })
+    return passages
+
+
+def collect_passages(docs_dirs=(LOCAL_DOCS_DIR, MIRROR_DOCS_DIR), commentary_path=COMMENTARY_PATH,
+                     df_bat=None, df_pit=None):
+    passages = []
+    for name, path in _doc_paths(docs_dirs).items():
+        for i, chunk in enumerate(chunk_text(read_document(path))):
+            passages.append({'id': f"doc:{name}#{i}", 'text': chunk})
+
+    if os.path.exists(commentary_path):
+        with open(commentary_path, encoding="utf-8") as f:
+            for name, text in json.load(f).items():
+                passages.append({'id': f"commentary:{name}", 'text': f"{name}：{text}"})
+
+    if df_bat is not None and df_pit is not None:
+        passages.extend(stat_passages(df_bat, df_pit))
+    return passages
+
+
+def sources_digest(docs_dirs=(LOCAL_DOCS_DIR, MIRROR_DOCS_DIR), commentary_path=COMMENTARY_PATH,
+                   raw_path=RAW_DATA_PATH):
+    h = hashlib.sha256(f"v{INDEX_VERSION}".encode())
+    paths = sorted(_doc_paths(docs_dirs).values()) + [commentary_path, raw_path]
+    for path in paths:
+        if os.path.exists(path):
+            h.update(os.path.basename(path).encode())
+            h.update(file_sha256(path).encode())
+    return h.hexdigest()[:16]
+
+
+class LocalRetriever:
+    """BM25 倒排索引。每個 posting 預先算好 BM25 權重，查詢時只需把命中的權重加總。
+
+    postings 依 term id 排序：term t 的 posting 在 [offsets[t], offsets[t + 1])。
+    """
+
+    def __init__(self, passages, vocab, offsets, doc_ids, weights, version=""):
+        self.passages = passages
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.version = version
+
+    @classmethod
+    def build(cls, passages, version=""):
+        vocab, terms, docs, tfs = {}, [], [], []
+        doc_len = np.zeros(len(passages), dtype=np.float32)
+        for i, p in enumerate(passages):
+            counts = Counter(tokenize(p['text']))
+            doc_len[i] = sum(counts.values())
+            for token, tf in counts.items():
+                terms.append(vocab.setdefault(token, len(vocab)))
+                docs.append(i)
+                tfs.append(tf)
+
+        terms = np.asarray(terms, dtype=np.int64)
+        order = np.argsort(terms, kind='stable')
+        terms, doc_ids = terms[order], np.asarray(docs, dtype=np.int32)[order]
+        tfs = np.asarray(tfs, dtype=np.float32)[order]
+
+        df = np.bincount(terms, minlength=len(vocab))
+        offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        n = max(len(passages), 1)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / max(doc_len.mean(), 1.0)) if len(passages) else doc_len
+        weights = idf[terms] * tfs * (BM25_K1 + 1) / (tfs + norm[doc_ids])
+        return cls(passages, vocab, offsets, doc_ids, weights.astype(np.float32), version)
+
+    def save(self, path=INDEX_DIR):
+        os.makedirs(path, exist_ok=True)
+        for name in ('offsets', 'doc_ids', 'weights'):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({'version': self.version, 'vocab': self.vocab, 'passages': self.passages}, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path=INDEX_DIR):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {n: np.load(os.path.join(path, f"{n}.npy"), mmap_mode='r') for n in ('offsets', 'doc_ids', 'weights')}
+        return cls(meta['passages'], meta['vocab'], version=meta['version'], **arrays)
+
+    def search(self, query, k=TOP_K):
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for token, count in Counter(tokenize(query)).items():
+            t = self.vocab.get(token)
+            if t is not None:
+                s, e = self.offsets[t], self.offsets[t + 1]
+                scores[self.doc_ids[s:e]] += count * self.weights[s:e]
+
+        k = min(k, int((scores > 0).sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[i]), self.passages[i]) for i in top]
+
+
+def format_context(results):
+    return "參考資料：\n" + "\n".join(f"[{i}] {p['text']}" for i, (_, p) in enumerate(results, 1))
+
+
+def load_retriever(path=INDEX_DIR, rebuild=False):
+    version = sources_digest()
+    if not rebuild:
+        try:
+            retriever = LocalRetriever.load(path)
+            if retriever.version == version:
+                return retriever
+        except (OSError, ValueError, KeyError):
+            pass
+
+    retriever = LocalRetriever.build(collect_passages(df_bat=load_batters(), df_pit=load_pitchers()), version)
+    try:
+        retriever.save(path)
+    except OSError as e:
+        print(f"索引寫入失敗: {e}")
+    return retriever
+
+
+@st.cache_resource(show_spinner=False)
+def load_local_retriever():
+    # 能連上 GitHub 時先補齊文件副本；離線時就用現有副本
+    if not os.path.isdir(LOCAL_DOCS_DIR):
+        try:
+            mirror_remote_docs(list_remote_docs())
+        except Exception as e:
+            print(f"文件同步失敗，使用本機副本: {e}")
+    return load_retriever()
+
+
+if __name__ == '__main__':
+    import sys
+    r = load_retriever(rebuild='--rebuild' in sys.argv)
+    print(f"已建置本機檢索索引: {len(r.passages)} 段，{len(r.vocab)} 詞")
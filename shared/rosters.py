@@ -0,0 +1,37 @@
+PARK_FACTORS = {
+    "洲際": {"Runs": 1.19}, "澄清湖": {"Runs": 1.03}, "天母": {"Runs": 0.96},
+    "新莊": {"Runs": 0.90}, "樂天桃園": {"Runs": 1.18}, "台南": {"Runs": 0.91},
+    "台北大巨蛋": {"Runs": 0.84}
+}
+
+STADIUM_MAP = {
+    "統一7-ELEVEn獅": ["台南"], "中信兄弟": ["洲際"], "樂天桃猿": ["樂天桃園"],
+    "味全龍": ["天母", "台北大巨蛋"], "富邦悍將": ["新莊"], "台鋼雄鷹": ["澄清湖"]
+}
+
+TEAM_ROSTERS = {
+    "統一7-ELEVEn獅": {
+        "pitchers": ["陳韻文", "蒙德茲", "劉予承", "髙塩將樹", "鍾允華", "邱浩鈞", "王鏡銘", "獅帝芬", "吳承諭", "胡智爲", "李軍", "辛俊昇", "郭俊麟", "飛力獅"],
+        "batters": ["陳傑憲", "林安可", "蘇智傑", "陳鏞基", "潘傑楷", "邱智呈", "陳聖平", "陳重羽", "林佳緯", "胡金龍", "林子豪", "許哲晏", "陳重廷", "林泓弦", "林祖傑", "林岱安", "柯育民", "朱迦恩"]
+    },
+    "台鋼雄鷹": {
+        "pitchers": ["江承諺", "陳柏清", "艾速特", "黃群", "王躍霖", "林詩翔", "韋宏亮", "黃紹睿", "櫻井周斗", "許育銘", "張誠恩", "郭俞延"],
+        "batters": ["魔鷹", "曾子祐", "王柏融", "吳念庭", "王博玄", "杜家明", "郭阜林", "郭永維", "葉保弟", "陳文杰", "藍寅倫", "紀慶然", "顏郁軒", "林家鋐", "曾昱磬", "高聖恩", "陳致嘉", "陳世嘉"]
+    },
+    "中信兄弟": {
+        "pitchers": ["德保拉", "呂彥青", "吳俊偉", "蔡齊哲", "李振昌", "鄭凱文", "魏碩成", "林暉盛", "江忠城", "羅戈", "鄭浩均", "李博登", "盧孟揚", "伍立辰", "韋禮加"],
+        "batters": ["江坤宇", "王威晨", "許基宏", "陳俊秀", "岳政華", "曾頌恩", "詹子賢", "岳東華", "高宇杰", "張志豪", "王政順", "林志綱", "張仁瑋", "黃韋盛", "許庭綸", "宋晟睿", "陳統恩", "徐博瑋"]
+    },
+    "樂天桃猿": {
+        "pitchers": ["威能帝", "魔神樂", "黃子鵬", "陳冠宇", "陳柏豪", "蘇俊璋", "莊昕諺", "王志煊", "賴胤豪", "朱承洋", "凱樂", "邱駿威", "林子崴", "陳克羿"],
+        "batters": ["林立", "梁家榮", "廖健富", "陳晨威", "林承飛", "朱育賢", "林泓育", "馬傑森", "林子偉", "林智平", "成晉", "余德龍", "林政華", "何品室融", "鍾玉成", "許賀捷", "李勛傑", "宋嘉翔", "張閔勛", "嚴宏鈞"]
+    },
+    "味全龍": {
+        "pitchers": ["徐若熙", "鋼龍", "陳冠偉", "林凱威", "林子昱", "郭郁政", "陳禹勳", "曹祐齊", "張景淯", "呂偉晟", "李致霖", "趙璟榮", "陳志杰", "張鈞守", "黃暐傑", "林鋅杰"],
+        "batters": ["吉力吉撈．鞏冠", "李凱威", "劉基鴻", "郭天信", "張政禹", "蔣少宏", "拿莫．伊漾", "林孝程", "劉俊緯", "陳思仲", "周委宏", "瑪仕革斯．俄霸律尼", "朱育賢", "王順和", "張祐銘", "張祐嘉", "林辰勳"]
+    },
+    "富邦悍將": {
+        "pitchers": ["曾峻岳", "王尉永", "江國豪", "黃保羅", "賴鴻誠", "廖任磊", "范柏絜", "李吳永勤", "魔力藍", "力亞士", "游霆崴", "林栚呈"],
+        "batters": ["張育成", "申皓瑋", "范國宸", "戴培峰", "王正棠", "董子恩", "王念好", "池恩齊", "李宗賢", "林澤彬", "高捷", "葉子霆", "黃兆維", "林岳谷", "潘瑋祥", "陳真", "張洺瑀", "蔡佳諺", "周佳樂", "豊暐", "魏全"]
+    }
+}
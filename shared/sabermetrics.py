@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from shared.cache import load_cached
+from shared.data import BAT_COLUMNS, PIT_COLUMNS, RAW_DATA_PATH, STANDINGS_PATH, TEAM_NAME_MAP, load_batters, read_raw
+
+RUN_SB = 0.2
+LEAGUE_SUM_COLUMNS = ['R', 'AB', 'H', 'CS', 'SF', 'SB', '1B', 'BB', 'HBP', 'IBB']
+
+# 衍生數據表版本；公式改動時調高，舊快取會被忽略
+STATS_VERSION = 1
+STATS_TABLES = tuple(f'{n}_v{STATS_VERSION}' for n in ('batting_stats', 'pitching_stats', 'league_constants'))
+
+WOBA_EVENTS = ['uBB', 'HBP', '1B', '2B', '3B', 'HR']
+LG_BAT_SUMS = ['PA', 'AB', 'H', '2B', '3B', 'HR', '1B', 'BB', 'IBB', 'HBP', 'SF', 'R', 'SB', 'CS']
+LG_PIT_SUMS = ['IP', 'ER', 'HR', 'BB', 'IBB', 'HBP', 'SO', 'FO']
+BORROWED_COLUMNS = ['runs_per_out', 'R_per_PA', 'wOBA_scale'] + [f'w{e}' for e in WOBA_EVENTS]
+
+
+def build_league_sums(df_bat):
+    # 每年一列的聯盟總和；多年份只要把對應列相加
+    return df_bat.groupby('Year')[LEAGUE_SUM_COLUMNS].sum().astype(float)
+
+
+def league_constants(league_sums, years):
+    lg = league_sums.loc[league_sums.index.intersection(list(years))].sum()
+
+    # 估算 Outs (Outs = AB - H + CS + SF)
+    lg_outs = (lg['AB'] - lg['H']) + lg['CS'] + lg['SF']
+    if lg_outs == 0: lg_outs = 1
+
+    # 動態計算 runCS (FanGraphs 公式: 2 * R/Outs + 0.075)
+    runs_per_out = lg['R'] / lg_outs
+    run_cs = -1 * (2 * runs_per_out + 0.075)
+
+    # 上壘機會 (Singles + BB + HBP - IBB)
+    lg_opportunities = lg['1B'] + lg['BB'] + lg['HBP'] - lg['IBB']
+    if lg_opportunities == 0: lg_opportunities = 1
+
+    lg_wsb = (lg['SB'] * RUN_SB + lg['CS'] * run_cs) / lg_opportunities
+    return {'runs_per_out': runs_per_out, 'runSB': RUN_SB, 'runCS': run_cs, 'lgwSB': lg_wsb}
+
+
+def wsb(df, constants):
+    opportunities = df['1B'] + df['BB'] + df['HBP'] - df['IBB']
+    return (df['SB'] * constants['runSB']) + (df['CS'] * constants['runCS']) - (constants['lgwSB'] * opportunities)
+
+
+def sb_rate(df):
+    attempt = (df['SB'] + df['CS']).to_numpy(dtype=float)
+    rate = np.divide(df['SB'].to_numpy(dtype=float) * 100, attempt, out=np.zeros_like(attempt), where=attempt > 0)
+    return pd.Series(rate, index=df.index)
+
+
+@st.cache_resource(show_spinner=False)
+def load_league_sums():
+    return build_league_sums(load_batters())
+
+
+@st.cache_data(show_spinner=False)
+def load_league_constants(years):
+    return league_constants(load_league_sums(), years)
+
+
+def ip_to_innings(ip):
+    # 50.1 局 = 50 又 1/3 局
+    whole = np.floor(ip)
+    return whole + (ip - whole) * 10 / 3
+
+
+def season_batting(raw):
+    # 全聯盟 (含已解散球隊) 每位打者每季一列
+    df = raw.sort_values(by=['Year', 'bat_PA'], ascending=[False, False])
+    df = df.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df = df[df['bat_PA'] > 0].rename(columns={'Name_clean': 'Name', 'Team Name_x': 'Team', **BAT_COLUMNS})
+    df = df.assign(uBB=df['BB'] - df['IBB'], Team=df['Team'].replace(TEAM_NAME_MAP))
+    return df[['Name', 'Team', 'Year'] + LG_BAT_SUMS + ['uBB']].reset_index(drop=True)
+
+
+def season_pitching(raw):
+    df = raw[(raw['pit_IP'] > 0) & (raw['bat_PA'] < 10)]
+    df = df.sort_values(by=['Year', 'pit_IP'], ascending=[False, False])
+    df = df.drop_duplicates(subset=['Name_clean', 'Year'], keep='first')
+    df = df.rename(columns={'Name_clean': 'Name', 'Team Name_y': 'Team', **PIT_COLUMNS})
+    df = df.assign(IP=ip_to_innings(df['IP']), Team=df['Team'].fillna('Unknown').replace(TEAM_NAME_MAP))
+    return df[['Name', 'Team', 'Year', 'BF'] + LG_PIT_SUMS].reset_index(drop=True)
+
+
+def build_league_table(bat, pit, standings):
+    """每季一列的聯盟常數：wOBA 權重與 scale、每打席得分、FIP 常數、HR/FB。
+
+    wOBA 權重採 Tango 的簡化線性權重 (以每出局得分推算各事件得分價值)，
+    再以聯盟 OBP 縮放，使 lgwOBA = lgOBP。
+    """
+    lg = bat.groupby('Year')[LG_BAT_SUMS].sum().astype(float)
+    lg['uBB'] = lg['BB'] - lg['IBB']
+
+    outs = (lg['AB'] - lg['H'] + lg['CS'] + lg['SF']).replace(0, 1)
+    lg['runs_per_out'] = lg['R'] / outs
+    lg['R_per_PA'] = lg['R'] / lg['PA'].replace(0, 1)
+
+    run = pd.DataFrame(index=lg.index)
+    run['uBB'] = lg['runs_per_out'] + 0.14
+    run['HBP'] = run['uBB'] + 0.025
+    run['1B'] = run['uBB'] + 0.155
+    run['2B'] = run['1B'] + 0.3
+    run['3B'] = run['2B'] + 0.27
+    run['HR'] = 1.4
+
+    # 相對於出局的得分價值
+    run_minus = (run * lg[WOBA_EVENTS]).sum(axis=1) / (lg['AB'] - lg['H'] + lg['SF']).replace(0, 1)
+    raw_w = run.add(run_minus, axis=0)
+    lg['lgOBP'] = (lg['H'] + lg['BB'] + lg['HBP']) / (lg['AB'] + lg['BB'] + lg['HBP'] + lg['SF']).replace(0, 1)
+    lg['wOBA_scale'] = lg['lgOBP'] / ((raw_w * lg[WOBA_EVENTS]).sum(axis=1) / _woba_denom(lg))
+    for event in WOBA_EVENTS:
+        lg[f'w{event}'] = raw_w[event] * lg['wOBA_scale']
+
+    lp = pit.groupby('Year')[LG_PIT_SUMS].sum().astype(float)
+    ip = lp['IP'].replace(0, 1)
+    lg['lgERA'] = lp['ER'] * 9 / ip
+    lg['cFIP'] = lg['lgERA'] - (13 * lp['HR'] + 3 * (lp['BB'] + lp['HBP'] - lp['IBB']) - 2 * lp['SO']) / ip
+    # 飛球 = 飛球出局 + 全壘打
+    lg['HR_per_FB'] = lp['HR'] / (lp['FO'] + lp['HR']).replace(0, 1)
+
+    games = standings.assign(G=standings['Win'] + standings['Lose'] + standings['Tie']).groupby('Year')['G'].sum() / 2
+    lg['G'] = games
+    lg['R_per_G'] = lg['R'] / games
+    return fill_incomplete_seasons(lg.reset_index())
+
+
+def _woba_denom(lg):
+    return (lg['AB'] + lg['uBB'] + lg['SF'] + lg['HBP']).replace(0, 1)
+
+
+def fill_incomplete_seasons(league):
+    # 進行中的賽季原始資料沒有得分/二壘安打，沿用上一個完整賽季的權重，
+    # lgwOBA 改用該季實際打擊內容計算，讓聯盟 wRAA 總和仍為 0
+    lg = league.sort_values('Year').reset_index(drop=True)
+    complete = lg['R'] > 0
+    lg[BORROWED_COLUMNS] = lg[BORROWED_COLUMNS].where(complete).ffill()
+    lg_woba = sum(lg[f'w{e}'] * lg[e] for e in WOBA_EVENTS) / _woba_denom(lg)
+    lg['lgwOBA'] = lg['lgOBP'].where(complete, lg_woba)
+    return lg
+
+
+def batting_stats(bat, league):
+    df = bat.merge(league[['Year', 'lgwOBA', 'wOBA_scale', 'R_per_PA'] + [f'w{e}' for e in WOBA_EVENTS]], on='Year')
+    numer = sum(df[f'w{e}'] * df[e] for e in WOBA_EVENTS)
+    denom = (df['AB'] + df['uBB'] + df['SF'] + df['HBP']).replace(0, np.nan)
+    df['wOBA'] = numer / denom
+    df['wRAA'] = (df['wOBA'] - df['lgwOBA']) / df['wOBA_scale'] * df['PA']
+    # 無球場因子，為中性球場的 wRC+
+    df['wRC'] = df['wRAA'] + df['R_per_PA'] * df['PA']
+    df['wRC+'] = (df['wRAA'] / df['PA'] + df['R_per_PA']) / df['R_per_PA'] * 100
+    return df[['Name', 'Team', 'Year', 'PA', 'wOBA', 'wRAA', 'wRC', 'wRC+']]
+
+
+def pitching_stats(pit, league):
+    df = pit.merge(league[['Year', 'cFIP', 'HR_per_FB']], on='Year')
+    ip = df['IP'].replace(0, np.nan)
+    walks = 3 * (df['BB'] + df['HBP'] - df['IBB']) - 2 * df['SO']
+    df['FIP'] = (13 * df['HR'] + walks) / ip + df['cFIP']
+    df['xFIP'] = (13 * (df['FO'] + df['HR']) * df['HR_per_FB'] + walks) / ip + df['cFIP']
+    df['K-BB%'] = (df['SO'] - df['BB']) / df['BF'].replace(0, np.nan)
+    return df[['Name', 'Team', 'Year', 'IP', 'FIP', 'xFIP', 'K-BB%']]
+
+
+def _finalize_stats(df):
+    df = df.assign(Name=df['Name'].astype(str).astype('category'), Team=df['Team'].astype(str).astype('category'),
+                   Year=df['Year'].astype(np.int16))
+    return df.sort_values(['Year', 'Name'], ascending=[False, True]).reset_index(drop=True)
+
+
+def build_stat_tables(sources=(RAW_DATA_PATH, STANDINGS_PATH)):
+    raw_path, standings_path = sources
+    return build_stat_tables_from(read_raw(raw_path), pd.read_csv(standings_path))
+
+
+def build_stat_tables_from(raw, standings):
+    bat, pit = season_batting(raw), season_pitching(raw)
+    league = build_league_table(bat, pit, standings)
+    return _finalize_stats(batting_stats(bat, league)), _finalize_stats(pitching_stats(pit, league)), league
+
+
+def update_stat_tables(tables, raw, standings, years):
+    """只重算 years 這幾季：聯盟常數、以及受影響季的打者/投手數據。
+
+    tables 為既有的 (batting, pitching, league)；raw 為更新後的原始資料。
+    借用權重的未完成賽季在前一季常數變動時也一併重算。
+    """
+    old_bat, old_pit, old_league = tables
+    years = set(int(y) for y in years)
+
+    # 緊接在受影響賽季之後、借用其權重的未完成賽季
+    incomplete = set(old_league.loc[old_league['R'] <= 0, 'Year'].astype(int))
+    for year in sorted(years):
+        while year + 1 in incomplete:
+            year += 1
+            years.add(year)
+
+    part = raw[raw['Year'].isin(years)]
+    bat, pit = season_batting(part), season_pitching(part)
+    league = pd.concat([old_league[~old_league['Year'].isin(years)],
+                        build_league_table(bat, pit, standings)], ignore_index=True)
+    league = fill_incomplete_seasons(league)
+
+    out = []
+    for old, new in ((old_bat, batting_stats(bat, league)), (old_pit, pitching_stats(pit, league))):
+        kept = old[~old['Year'].isin(years)]
+        out.append(_finalize_stats(pd.concat([kept.astype({'Name': str, 'Team': str}), new], ignore_index=True)))
+    return out[0], out[1], league, sorted(years)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_stat_tables():
+    return load_cached(STATS_TABLES, (RAW_DATA_PATH, STANDINGS_PATH), build_stat_tables)
+
+
+def load_batting_stats():
+    return _load_stat_tables()[0].copy(deep=False)
+
+
+def load_pitching_stats():
+    return _load_stat_tables()[1].copy(deep=False)
+
+
+def load_league_table():
+    return _load_stat_tables()[2].copy(deep=False)
+
+
+if __name__ == '__main__':
+    import sys
+    tables = load_cached(STATS_TABLES, (RAW_DATA_PATH, STANDINGS_PATH), build_stat_tables, rebuild='--rebuild' in sys.argv)
+    print(f"已建置衍生數據表 v{STATS_VERSION}: " + ", ".join(f"{n} ({len(t)} 列)" for n, t in zip(STATS_TABLES, tables)))
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from shared.data import TEAM_NAME_MAP
+
+SEASON_GAMES = 120
+PLAYOFF_SPOTS = 3
+CHUNK_SEASONS = 10_000
+
+
+def round_robin_schedule(n_teams, season_games=SEASON_GAMES):
+    # 每組對戰主客場各半，例：6 隊 120 場 -> 每隊對每個對手主場 12 場
+    per_pair = season_games // (2 * (n_teams - 1))
+    home, away = np.nonzero(~np.eye(n_teams, dtype=bool))
+    return np.repeat(home, per_pair), np.repeat(away, per_pair)
+
+
+def simulate_seasons(p_home, n_seasons, seed=None, season_games=SEASON_GAMES,
+                     playoff_spots=PLAYOFF_SPOTS, chunk_seasons=CHUNK_SEASONS):
+    """p_home[i, j] 為 i 隊主場對 j 隊的勝率；回傳各隊平均勝場、季後賽與第一名機率。"""
+    p_home = np.asarray(p_home, dtype=np.float32)
+    n_teams = len(p_home)
+    rng = np.random.default_rng(seed)
+
+    home, away = round_robin_schedule(n_teams, season_games)
+    p_games = p_home[home, away]
+    # 勝場 = 主場勝 @ (主隊 one-hot - 客隊 one-hot) + 客隊出賽數
+    teams = np.arange(n_teams)
+    swing = (home[:, None] == teams).astype(np.float32) - (away[:, None] == teams).astype(np.float32)
+    away_games = np.bincount(away, minlength=n_teams).astype(np.float32)
+
+    wins_total = np.zeros(n_teams)
+    first = np.zeros(n_teams, dtype=np.int64)
+    playoff = np.zeros(n_teams, dtype=np.int64)
+    for start in range(0, n_seasons, chunk_seasons):
+        n = min(chunk_seasons, n_seasons - start)
+        home_win = (rng.random((n, len(p_games)), dtype=np.float32) < p_games).astype(np.float32)
+        wins = home_win @ swing + away_games
+
+        # 同勝場以亂數決定名次
+        order = np.argsort(-(wins + rng.random(wins.shape, dtype=np.float32)), axis=1)
+        wins_total += wins.sum(axis=0)
+        first += np.bincount(order[:, 0], minlength=n_teams)
+        playoff += np.bincount(order[:, :playoff_spots].ravel(), minlength=n_teams)
+
+    return pd.DataFrame({
+        'Avg_W': wins_total / n_seasons,
+        'Playoff_Pct': playoff / n_seasons,
+        'First_Pct': first / n_seasons,
+    })
+
+
+def historical_summary(standings, teams, playoff_spots=PLAYOFF_SPOTS):
+    # standings.csv 各隊歷年 勝率 / 第一名 / 前三名 比例，以及最近一季戰績
+    df = standings.assign(Team=standings['Team'].replace(TEAM_NAME_MAP))
+    df = df.assign(Win_Pct=df['Win'] / (df['Win'] + df['Lose']).replace(0, 1))
+    df['Rank'] = df.groupby('Year')['Win_Pct'].rank(ascending=False, method='min')
+
+    hist = df[df['Team'].isin(teams)].groupby('Team').agg(
+        Seasons=('Year', 'size'),
+        Hist_Win_Pct=('Win_Pct', 'mean'),
+        Hist_First_Pct=('Rank', lambda r: (r == 1).mean()),
+        Hist_Top3_Pct=('Rank', lambda r: (r <= playoff_spots).mean()),
+    )
+    last = df[df['Year'] == df['Year'].max()].set_index('Team')['Win']
+    hist[f"W_{df['Year'].max()}"] = last
+    return hist.reindex(teams)
+
+
+def season_outlook(p_home, teams, n_seasons, seed=None, standings=None):
+    result = simulate_seasons(p_home, n_seasons, seed=seed)
+    result.insert(0, 'Team', teams)
+    if standings is not None:
+        result = result.merge(historical_summary(standings, teams), left_on='Team', right_index=True, how='left')
+    return result
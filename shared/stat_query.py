@@ -0,0 +1,227 @@
+"""直接從球員數據表回答的查詢：「陳傑憲 2024 OPS」、「2025 最多全壘打」。
+
+辨識出 球員 / 年份 / 數據項目 就在本機查表回答，其餘開放式問題才交給 LLM。
+"""
+import re
+from dataclasses import dataclass
+
+import streamlit as st
+
+from shared.data import load_batters, load_pitchers
+from shared.players import PlayerIndex
+from shared.sabermetrics import load_batting_stats, load_pitching_stats
+
+LEADER_LIMIT = 5
+
+
+@dataclass(frozen=True)
+class Stat:
+    column: str
+    label: str
+    kind: str  # 'bat' / 'pit'
+    fmt: str = '{:.0f}'
+    higher_is_better: bool = True
+    min_sample: float = 0  # 排行榜門檻：打者看 PA、投手看 IP
+
+
+STATS = [
+    Stat('AVG', '打擊率', 'bat', '{:.3f}', min_sample=100),
+    Stat('OBP', '上壘率', 'bat', '{:.3f}', min_sample=100),
+    Stat('SLG', '長打率', 'bat', '{:.3f}', min_sample=100),
+    Stat('OPS', 'OPS', 'bat', '{:.3f}', min_sample=100),
+    Stat('wOBA', 'wOBA', 'bat', '{:.3f}', min_sample=100),
+    Stat('wRC+', 'wRC+', 'bat', '{:.0f}', min_sample=100),
+    Stat('HR', '全壘打', 'bat'),
+    Stat('RBI', '打點', 'bat'),
+    Stat('SB', '盜壘', 'bat'),
+    Stat('H', '安打', 'bat'),
+    Stat('PA', '打席', 'bat'),
+    Stat('BB', '保送', 'bat'),
+    Stat('SO', '三振', 'bat', higher_is_better=False),
+    Stat('ERA', '防禦率', 'pit', '{:.2f}', higher_is_better=False, min_sample=30),
+    Stat('WHIP', 'WHIP', 'pit', '{:.2f}', higher_is_better=False, min_sample=30),
+    Stat('FIP', 'FIP', 'pit', '{:.2f}', higher_is_better=False, min_sample=30),
+    Stat('xFIP', 'xFIP', 'pit', '{:.2f}', higher_is_better=False, min_sample=30),
+    Stat('W', '勝投', 'pit'),
+    Stat('L', '敗投', 'pit', higher_is_better=False),
+    Stat('IP', '投球局數', 'pit', '{:.1f}'),
+    Stat('SO', '三振', 'pit'),
+]
+
+# 問句裡的說法 -> 數據欄位；打者與投手都有的欄位 (三振) 依球員身分決定
+ALIASES = {
+    'avg': 'AVG', '打擊率': 'AVG', 'obp': 'OBP', '上壘率': 'OBP', 'slg': 'SLG', '長打率': 'SLG',
+    'ops': 'OPS', 'woba': 'wOBA', 'wrc+': 'wRC+', 'wrc': 'wRC+',
+    'hr': 'HR', '全壘打': 'HR', '全壘打數': 'HR', 'rbi': 'RBI', '打點': 'RBI',
+    'sb': 'SB', '盜壘': 'SB', '安打': 'H', '打席': 'PA', 'pa': 'PA', '保送': 'BB', '四壞': 'BB',
+    'so': 'SO', '三振': 'SO', 'k': 'SO',
+    'era': 'ERA', '防禦率': 'ERA', 'whip': 'WHIP', 'xfip': 'xFIP', 'fip': 'FIP',
+    '勝投': 'W', '勝場': 'W', '敗投': 'L', 'ip': 'IP', '局數': 'IP', '投球局數': 'IP',
+}
+LEADER_WORDS = ('最多', '最高', '最好', '最佳', '最強', '領先', '排行', '第一', '最少', '最低', '最差')
+# 排序方向：明講高低就照字面，否則由好到壞 (最差則由壞到好)
+ASCENDING_WORDS = ('最少', '最低')
+DESCENDING_WORDS = ('最多', '最高')
+WORST_WORDS = ('最差',)
+CURRENT_WORDS = ('今年', '本季', '這季', '今季')
+# 需要解釋、比較的問題一律交給 LLM
+ANALYSIS_WORDS = ('為什麼', '為何', '原因', '分析', '比較', '對比', '怎麼', '如何', '評價', '趨勢', '預測', '建議')
+# 純查詢問句裡可以出現的贅字；拿掉球員、年份、數據項目與這些字後若還有剩，就不是單純查表
+FILLER_WORDS = ('請問', '查詢', '一下', '多少', '是誰', '有誰', '哪位', '哪些', '誰', '球員', '打者', '投手',
+                '前五名', '前5名', '前五', '前5', '名', '數據', '成績', '紀錄', '球季', '賽季', '年度',
+                '年', '季', '的', '是', '有', '呢', '嗎', '幾', '查', '多')
+_PUNCT = re.compile(r'[\s?？,，。.!！:：、~～]+')
+
+_YEAR = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+# 英文縮寫需獨立成詞 (避免 "ops" 命中 "whops" 之類)，中文直接子字串比對
+_ALIAS_ORDER = sorted(ALIASES, key=len, reverse=True)
+
+
+def _alias_pattern(alias):
+    if alias.isascii():
+        return rf'(?<![a-z]){re.escape(alias)}(?![a-z])'
+    return re.escape(alias)
+
+
+def _find_alias(text):
+    for alias in _ALIAS_ORDER:
+        if re.search(_alias_pattern(alias), text):
+            return ALIASES[alias]
+    return None
+
+
+def _strip_aliases(text):
+    """拿掉所有數據項目的說法，回傳 (剩下的文字, 出現過的欄位集合)。"""
+    stats = set()
+    for alias in _ALIAS_ORDER:
+        text, n = re.subn(_alias_pattern(alias), ' ', text)
+        if n:
+            stats.add(ALIASES[alias])
+    return text, stats
+
+
+class StatQuery:
+    def __init__(self, df_bat, df_pit):
+        self.tables = {'bat': df_bat.reset_index(drop=True), 'pit': df_pit.reset_index(drop=True)}
+        self.index = {kind: PlayerIndex(df) for kind, df in self.tables.items()}
+        self.stats = {(s.kind, s.column): s for s in STATS}
+        # 打者、投手的資料不一定涵蓋同樣的年份 (例如當季只收錄打者)
+        self.latest_year = {kind: int(df['Year'].max()) for kind, df in self.tables.items()}
+        # 長名字優先，避免「林立」蓋掉「林立誠」之類
+        names = set(self.index['bat'].names()) | set(self.index['pit'].names())
+        self.names = sorted((n for n in names if len(n) >= 2), key=len, reverse=True)
+
+    def parse(self, text):
+        text = str(text).strip().lower()
+        players = []
+        stripped = text
+        for name in self.names:
+            if name.lower() in stripped:
+                players.append(name)
+                stripped = stripped.replace(name.lower(), ' ')
+
+        years = [int(y) for y in _YEAR.findall(stripped)]
+        rest, stats = _strip_aliases(_YEAR.sub(' ', stripped))
+        for word in (*CURRENT_WORDS, *LEADER_WORDS, *FILLER_WORDS):
+            rest = rest.replace(word, ' ')
+
+        return {
+            'player': players[0] if len(players) == 1 else None,
+            'players': players,
+            'year': years[0] if years else None,
+            'current': any(w in stripped for w in CURRENT_WORDS),
+            'stat': _find_alias(_YEAR.sub(' ', stripped)),
+            'leader': any(w in stripped for w in LEADER_WORDS),
+            'order': next((o for o, words in (('asc', ASCENDING_WORDS), ('desc', DESCENDING_WORDS),
+                                              ('worst', WORST_WORDS)) if any(w in stripped for w in words)), 'best'),
+            # 單純查表：最多一位球員、一個年份、一個數據項目，沒有分析用語，也沒有其他文字
+            'simple': (len(players) <= 1 and len(set(years)) <= 1 and len(stats) == 1
+                       and not any(w in text for w in ANALYSIS_WORDS) and not _PUNCT.sub('', rest)),
+        }
+
+    def _stat_for(self, column, player=None):
+        # 同名項目 (三振) 依球員身分選打者或投手；排行榜預設打者
+        kinds = ['bat', 'pit']
+        if player is not None and player not in self.index['bat']:
+            kinds = ['pit']
+        for kind in kinds:
+            if (kind, column) in self.stats and (player is None or player in self.index[kind]):
+                return self.stats[(kind, column)]
+        return None
+
+    def lookup(self, player, stat, year=None):
+        """回傳 [(年份, 球隊, 數值)]，year 為 None 時列出最近幾季 (新到舊)。"""
+        s = self._stat_for(stat, player)
+        if s is None:
+            return s, []
+        years = [year] if year is not None else None
+        rows = self.index[s.kind].rows(player, years)
+        return s, [(int(r.Year), r.Team, float(r[s.column])) for _, r in rows.iterrows()]
+
+    def leaders(self, stat, year, order='best', limit=LEADER_LIMIT):
+        s = self._stat_for(stat)
+        df = self.tables[s.kind]
+        df = df[df['Year'] == year]
+        sample = df['PA'] if s.kind == 'bat' else df['IP']
+        df = df[sample >= s.min_sample].dropna(subset=[s.column])
+
+        ascending = {'asc': True, 'desc': False, 'best': not s.higher_is_better, 'worst': s.higher_is_better}[order]
+        if not ascending:
+            # 數據為 0 (例如當季資料尚未收錄) 不列入由高到低的排行
+            df = df[df[s.column] > 0]
+        top = df.sort_values(s.column, ascending=ascending, kind='stable').head(limit)
+        return s, [(r.Name, r.Team, float(r[s.column])) for _, r in top.iterrows()]
+
+    def answer(self, text):
+        """單純的查表問題回傳 markdown 回答；其他問題 (含查無資料) 回傳 None 交給 LLM。"""
+        q = self.parse(text)
+        if not q['simple'] or q['stat'] is None:
+            return None
+
+        if q['player']:
+            s = self._stat_for(q['stat'], q['player'])
+            if s is None:
+                return None
+            year = self.latest_year[s.kind] if q['current'] and q['year'] is None else q['year']
+            _, rows = self.lookup(q['player'], q['stat'], year)
+            if not rows:
+                return None
+            lines = [f"- {y} 年（{team}）：**{s.fmt.format(v)}**" for y, team, v in rows[:LEADER_LIMIT]]
+            return f"**{q['player']}** 的{s.label}：\n" + "\n".join(lines)
+
+        if q['leader'] and not q['players']:
+            s = self._stat_for(q['stat'])
+            year = q['year'] or self.latest_year[s.kind]
+            s, rows = self.leaders(q['stat'], year, q['order'])
+            if not rows:
+                return None
+            lines = [f"{i}. {name}（{team}）：**{s.fmt.format(v)}**" for i, (name, team, v) in enumerate(rows, 1)]
+            return f"**{year} 年{s.label}排行**\n" + "\n".join(lines)
+        return None
+
+    # 提供給 Gemini 的 function tool：函式名稱與 docstring 即為工具說明
+    def lookup_player_stat(self, player: str, stat: str, year: int = 0) -> dict:
+        """查詢中華職棒球員單季數據。
+
+        Args:
+            player: 球員姓名，例如「陳傑憲」。
+            stat: 數據項目，例如 OPS、打擊率、全壘打、防禦率、WHIP、FIP。
+            year: 球季年份；0 代表列出最近幾季。
+        """
+        column = _find_alias(str(stat).lower()) or stat
+        s, rows = self.lookup(player.strip(), column, year or None)
+        if s is None:
+            return {'error': f'找不到 {player} 的 {stat}'}
+        return {'player': player, 'stat': s.label,
+                'seasons': [{'year': y, 'team': team, 'value': round(v, 3)} for y, team, v in rows]}
+
+
+def build_stat_query():
+    bat = load_batters().merge(load_batting_stats()[['Name', 'Year', 'wOBA', 'wRC+']], on=['Name', 'Year'], how='left')
+    pit = load_pitchers().merge(load_pitching_stats()[['Name', 'Year', 'FIP', 'xFIP']], on=['Name', 'Year'], how='left')
+    return StatQuery(bat, pit)
+
+
+@st.cache_resource(show_spinner=False)
+def load_stat_query():
+    return build_stat_query()
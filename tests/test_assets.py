@@ -0,0 +1,133 @@
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from shared import assets
+
+SLOW = 0.2
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 + Content-Length：連線可以留在連線池重複使用
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.connections.add(self.client_address)
+            body = f"{self.path}#{server.hits[self.path]}".encode()
+        if self.path.startswith("/slow/"):
+            time.sleep(SLOW)
+        status = 404 if self.path.startswith("/missing") else 200
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.hits, httpd.connections = {}, set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def closed_url():
+    # 沒有人在聽的 port：模擬離線
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/asset.png"
+
+
+def test_fetch_reads_disk_cache_after_first_download(server, tmp_path):
+    url = f"{server.url}/sprite.png"
+    first = assets.fetch(url, "v1", cache_dir=tmp_path)
+    second = assets.fetch(url, "v1", cache_dir=tmp_path)
+
+    assert (first.status_code, first.from_cache) == (200, False)
+    assert second.from_cache and second.content == first.content
+    assert server.hits["/sprite.png"] == 1
+
+
+def test_new_version_or_expired_max_age_downloads_again(server, tmp_path):
+    url = f"{server.url}/list.json"
+    assets.fetch(url, "v1", cache_dir=tmp_path)
+    assets.fetch(url, "v2", cache_dir=tmp_path)
+    assert server.hits["/list.json"] == 2
+
+    assert assets.fetch(url, "v2", max_age=0, cache_dir=tmp_path).content == b"/list.json#3"
+    assert assets.fetch(url, "v2", max_age=3600, cache_dir=tmp_path).from_cache
+    assert server.hits["/list.json"] == 3
+
+
+def test_non_200_is_returned_but_not_cached(server, tmp_path):
+    url = f"{server.url}/missing.png"
+    res = assets.fetch(url, cache_dir=tmp_path)
+
+    assert res.status_code == 404
+    assert not os.path.exists(assets.cache_path(url, cache_dir=tmp_path))
+    assert assets.fetch(url, cache_dir=tmp_path).status_code == 404
+    assert server.hits["/missing.png"] == 2
+
+
+def test_non_200_falls_back_to_stale_copy(server, tmp_path):
+    url = f"{server.url}/missing.json"
+    assets._write(assets.cache_path(url, cache_dir=tmp_path), b"old")
+
+    res = assets.fetch(url, max_age=0, cache_dir=tmp_path)
+    assert (res.status_code, res.content, res.from_cache) == (200, b"old", True)
+
+
+def test_offline_serves_stale_copy_or_raises(closed_url, tmp_path):
+    with pytest.raises(requests.ConnectionError):
+        assets.fetch(closed_url, cache_dir=tmp_path)
+
+    assets._write(assets.cache_path(closed_url, cache_dir=tmp_path), b"old")
+    res = assets.fetch(closed_url, max_age=0, cache_dir=tmp_path)
+    assert (res.content, res.from_cache) == (b"old", True)
+
+
+def test_prefetch_downloads_in_parallel_and_reuses_connections(server, tmp_path):
+    n = assets.FETCH_WORKERS
+    batch = [f"{server.url}/slow/{i}.png" for i in range(n)]
+
+    t = time.perf_counter()
+    results = assets.prefetch(batch + batch[:2], cache_dir=tmp_path)
+    elapsed = time.perf_counter() - t
+
+    assert list(results) == batch
+    assert all(r.status_code == 200 for r in results.values())
+    assert elapsed < SLOW * n / 2
+
+    # 第二批新網址：沿用共用 Session 連線池裡的連線，不必重新連線
+    assets.prefetch([f"{server.url}/slow/next-{i}.png" for i in range(n)], cache_dir=tmp_path)
+    assert sum(server.hits.values()) == 2 * n
+    assert len(server.connections) <= n
+
+
+def test_prefetch_without_wait_returns_futures(server, closed_url, tmp_path):
+    url = f"{server.url}/bg.png"
+    futures = assets.prefetch([url, closed_url], cache_dir=tmp_path, wait=False)
+
+    assert futures[url].result().content == b"/bg.png#1"
+    # 下載失敗以例外物件回傳，不會讓背景預先下載中斷
+    assert isinstance(futures[closed_url].result(), requests.ConnectionError)
+    assert assets.fetch(url, cache_dir=tmp_path).from_cache
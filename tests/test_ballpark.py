@@ -0,0 +1,108 @@
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from shared.ballpark import (FIELD_H, FIELD_W, HIT_ALPHA, IMAGES, PLACEMENTS, _tile, build_atlas,
+                             build_field_states, load_atlas, sprite_origin, sprite_size)
+
+SPRITE = 512
+BORDER = 64  # 素材四周的透明邊
+
+
+def sprite_image(url, solid):
+    # 背景 1600x1200 全不透明；sprite 512x512 帶透明邊，solid=False 時內部 alpha 也是亂數
+    rng = np.random.default_rng(zlib.crc32(url.encode()))
+    size = (1200, 1600) if url == IMAGES["BG"] else (SPRITE, SPRITE)
+    px = rng.integers(0, 255, size=(*size, 4), dtype=np.uint8)
+    if url == IMAGES["BG"] or solid:
+        px[..., 3] = 255
+    if url != IMAGES["BG"]:
+        px[:BORDER], px[-BORDER:], px[:, :BORDER], px[:, -BORDER:] = 0, 0, 0, 0
+    return Image.fromarray(px, "RGBA")
+
+
+@pytest.fixture(scope="module")
+def noisy():
+    atlas, rects = build_atlas(lambda url: sprite_image(url, solid=False))
+    return atlas, rects, build_field_states(atlas, rects)
+
+
+@pytest.fixture(scope="module")
+def solid():
+    atlas, rects = build_atlas(lambda url: sprite_image(url, solid=True))
+    return build_field_states(atlas, rects)
+
+
+def expected_role(alphas, selected_role, x, y):
+    # 由上層往下找第一個不透明的像素
+    for role in reversed(PLACEMENTS):
+        alpha = alphas[f"{role}@sel" if role == selected_role else role]
+        sx, sy = sprite_origin(role)
+        if 0 <= x - sx < alpha.shape[1] and 0 <= y - sy < alpha.shape[0] and alpha[y - sy, x - sx] >= HIT_ALPHA:
+            return role
+    return None
+
+
+def opaque_box(role, selected=False, margin=3):
+    # 縮放後 sprite 不透明的範圍 (內縮幾個像素避開縮放造成的半透明邊)
+    (x, y), (w, h) = sprite_origin(role), sprite_size(role, selected)
+    bx, by = w * BORDER // SPRITE + margin, h * BORDER // SPRITE + margin
+    return x + bx, y + by, x + w - bx, y + h - by
+
+
+def test_hit_map_matches_z_ordered_alpha(noisy):
+    atlas, rects, states = noisy
+    alphas = {key: np.asarray(_tile(atlas, rects, key))[..., 3] for key in rects}
+    rng = np.random.default_rng(0)
+    for selected_role, (_, hit_map) in states.items():
+        for x, y in zip(rng.integers(0, FIELD_W, 500), rng.integers(0, FIELD_H, 500)):
+            x, y = int(x), int(y)
+            assert hit_map.role_at(x, y) == expected_role(alphas, selected_role, x, y), (selected_role, x, y)
+
+
+@pytest.mark.parametrize("selected_role", [None, "P", "Batter"])
+def test_overlap_goes_to_the_sprite_drawn_on_top(solid, selected_role):
+    hit_map = solid[selected_role][1]
+    # 打者在投手之後畫上，兩者不透明處重疊時算點到打者 (舊版矩形掃描會回傳先列出的投手)
+    px1, py1, px2, py2 = opaque_box("P", selected_role == "P")
+    bx1, by1, bx2, by2 = opaque_box("Batter", selected_role == "Batter")
+    assert bx1 < px2 and by1 < py2
+    assert hit_map.role_at((max(px1, bx1) + min(px2, bx2)) // 2, (max(py1, by1) + min(py2, by2)) // 2) == "Batter"
+
+
+def test_transparent_part_of_upper_sprite_falls_through(solid):
+    hit_map = solid[None][1]
+    px1, py1, px2, py2 = opaque_box("P")
+    bx1, by1, bx2, by2 = opaque_box("Batter")
+    x0, _ = sprite_origin("Batter")
+    w, _ = sprite_size("Batter")
+
+    # 打者右側透明邊、但仍在投手的不透明範圍內
+    x, y = (bx2 + x0 + w) // 2 + 1, (by1 + py2) // 2
+    assert bx2 < x < x0 + w and px1 < x < px2 and by1 < y < py2
+    assert hit_map.role_at(x, y) == "P"
+    # 打者左側透明邊，其他球員都不在這裡
+    assert hit_map.role_at(x0 + 2, by2 - 5) is None
+
+
+def test_clicks_outside_the_field_miss(solid):
+    hit_map = solid[None][1]
+    assert hit_map.role_at(-1, 10) is None
+    assert hit_map.role_at(FIELD_W, 10) is None
+
+
+def test_load_atlas_builds_once_then_reads_disk(tmp_path):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return sprite_image(url, solid=True)
+
+    atlas, rects = load_atlas(tmp_path, fetch)
+    assert sorted(fetched) == sorted(IMAGES.values())
+
+    cached, cached_rects = load_atlas(tmp_path, lambda url: pytest.fail("不應重新下載"))
+    assert cached_rects == rects
+    assert np.array_equal(np.asarray(cached), np.asarray(atlas))
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+from shared.chat import CHAT_MODEL, ResponseCache, normalize_prompt, stream_answer
+
+
+class FakeModels:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = []
+        self.sent = 0
+
+    def generate_content_stream(self, model, contents, config):
+        self.calls.append((model, contents, config))
+        for text in self.chunks:
+            self.sent += 1
+            yield SimpleNamespace(text=text)
+
+
+class FakeClient:
+    def __init__(self, chunks):
+        self.models = FakeModels(chunks)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stream_answer_yields_chunks_as_they_arrive():
+    client = FakeClient(["林立", None, "", "本季打擊率 0.353"])
+    stream = stream_answer(client, "林立表現如何", config={'temperature': 0})
+
+    # 第一段文字到了就先交出去，不等整段回覆
+    assert next(stream) == "林立"
+    assert client.models.sent == 1
+    assert list(stream) == ["本季打擊率 0.353"]
+    assert client.models.calls == [(CHAT_MODEL, "林立表現如何", {'temperature': 0})]
+
+
+def test_normalize_prompt_ignores_width_case_spacing_and_trailing_punctuation():
+    assert normalize_prompt("  林立　ＯＰＳ  多少？？ ") == normalize_prompt("林立 ops 多少")
+
+
+def test_cache_hit_and_miss():
+    cache = ResponseCache()
+    assert cache.get("林立 OPS", "v1") is None
+
+    cache.put("林立 OPS", "v1", "0.852")
+    assert cache.get("林立 ＯＰＳ？", "v1") == "0.852"
+    # 知識庫版本不同就是不同的 key
+    assert cache.get("林立 OPS", "v2") is None
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+
+
+def test_empty_answer_is_not_cached():
+    cache = ResponseCache()
+    cache.put("林立 OPS", "v1", "")
+    assert cache.stats()['entries'] == 0
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=60, clock=clock)
+    cache.put("林立 OPS", "v1", "0.852")
+
+    clock.now = 60
+    assert cache.get("林立 OPS", "v1") == "0.852"
+    clock.now = 61
+    assert cache.get("林立 OPS", "v1") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "v1", "A")
+    cache.put("b", "v1", "B")
+    cache.get("a", "v1")
+    cache.put("c", "v1", "C")
+
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == "A"
+    assert cache.get("c", "v1") == "C"
+    assert cache.stats()['entries'] == 2
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from shared.ingest import RATE_FORMULAS, upsert_raw
+
+COUNTS = ['bat_PA', 'bat_AB', 'bat_H', 'bat_2B', 'bat_3B', 'bat_HR', 'bat_BB', 'bat_HBP', 'bat_SF', 'bat_SO']
+
+
+def player(pid, name, year, team, h, **counts):
+    row = {'ID': pid, 'Name_clean': name, 'Year': year, 'Team Name_x': team, 'Team Name_y': team}
+    row.update(dict.fromkeys(COUNTS, 0), bat_PA=100, bat_AB=90, bat_H=h)
+    row.update(counts)
+    return row
+
+
+@pytest.fixture
+def raw():
+    rows = [player(1, '林立', 2024, '樂天桃猿', 30), player(2, '江坤宇', 2024, '中信兄弟', 25),
+            player(3, '陳傑憲', 2024, '統一7-ELEVEn獅', 40), player(2, '江坤宇', 2025, '中信兄弟', 10)]
+    df = pd.DataFrame(rows)
+    for col, formula in RATE_FORMULAS.items():
+        df[col] = formula(df)
+    return df
+
+
+def test_matching_rows_are_replaced_in_place(raw):
+    delta = pd.DataFrame([player(2, '江坤宇', 2025, '中信兄弟', 20, bat_2B=4, bat_HR=1),
+                          player(0, '新人', 2025, '台鋼雄鷹', 5)])
+    merged, years = upsert_raw(raw, delta)
+
+    assert years == [2025]
+    assert merged['Name_clean'].tolist() == ['林立', '江坤宇', '陳傑憲', '江坤宇', '新人']
+    pd.testing.assert_frame_equal(merged.iloc[:3], raw.iloc[:3])
+    updated = merged.iloc[3]
+    assert (updated['bat_H'], updated['bat_1B'], updated['bat_TB']) == (20, 15, 27)
+    assert merged.dtypes.equals(raw.dtypes)
+
+
+def test_missing_columns_keep_existing_values_and_rates_are_recomputed(raw):
+    delta = pd.DataFrame([{'ID': 1, 'Name_clean': '林立', 'Year': 2024, 'Team Name_x': '樂天桃猿',
+                           'Team Name_y': '樂天桃猿', 'bat_H': 36, 'bat_3B': 2}])
+    merged, _ = upsert_raw(raw, delta)
+
+    row = merged.iloc[0]
+    assert (row['bat_PA'], row['bat_AB']) == (100, 90)
+    assert row['bat_1B'] == 34
+    assert row['bat_AVG'] == pytest.approx(36 / 90)
+
+
+def test_rates_given_in_delta_are_not_overwritten(raw):
+    delta = pd.DataFrame([player(3, '陳傑憲', 2024, '統一7-ELEVEn獅', 40, bat_1B=33)])
+    merged, _ = upsert_raw(raw, delta)
+    assert merged.iloc[2]['bat_1B'] == 33
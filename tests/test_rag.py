@@ -0,0 +1,148 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from shared import rag
+from shared.rag import initialize_rag, read_manifest, sync_store
+
+
+class Response:
+    def __init__(self, status_code=200, payload=None, content=b"data"):
+        self.status_code = status_code
+        self.payload = payload
+        self.content = content
+
+    def json(self):
+        return self.payload
+
+
+class FakeGitHub:
+    def __init__(self, files):
+        self.files = dict(files)  # {檔名: sha}
+
+    def __call__(self, url):
+        if url == rag.GITHUB_API_URL:
+            return Response(payload=[{'name': n, 'sha': sha, 'download_url': f'dl/{n}'} for n, sha in self.files.items()])
+        return Response(content=url.encode())
+
+
+class FakeClient:
+    """file_search_stores / operations 的最小替身：上傳是長時間作業，第一次 get 之後才完成。"""
+
+    def __init__(self, existing=()):
+        self.lock = threading.Lock()
+        self.documents = {f'doc/{n}-0': n for n in existing}  # {文件名稱: 顯示名稱}
+        self.uploads = []
+        self.deleted = []
+        self.polls = 0
+        self.file_search_stores = SimpleNamespace(
+            list=lambda: [SimpleNamespace(display_name=rag.TARGET_STORE_NAME, name='stores/1')],
+            create=None,
+            upload_to_file_search_store=self._upload,
+            documents=SimpleNamespace(list=self._list, delete=self._delete),
+        )
+        self.operations = SimpleNamespace(get=self._get)
+
+    def _list(self, parent):
+        assert parent == 'stores/1'
+        return [SimpleNamespace(name=name, display_name=display) for name, display in self.documents.items()]
+
+    def _upload(self, file, file_search_store_name, config):
+        with self.lock:
+            self.uploads.append(config['display_name'])
+            document = f"doc/{config['display_name']}-{len(self.uploads)}"
+        return SimpleNamespace(name=f'op/{document}', done=False, error=None, response=None, document=document)
+
+    def _get(self, op):
+        with self.lock:
+            self.polls += 1
+            self.documents[op.document] = op.document.split('/')[1].rsplit('-', 1)[0]
+        return SimpleNamespace(name=op.name, done=True, error=None, response=SimpleNamespace(document_name=op.document))
+
+    def _delete(self, name, config):
+        with self.lock:
+            self.deleted.append(name)
+            self.documents.pop(name, None)
+
+
+@pytest.fixture(autouse=True)
+def no_poll_delay(monkeypatch):
+    monkeypatch.setattr(rag, 'UPLOAD_POLL_INTERVAL', 0)
+
+
+def test_first_sync_seeds_from_existing_store(tmp_path):
+    manifest = tmp_path / 'manifest.json'
+    client = FakeClient(existing=['a.pdf'])
+    github = FakeGitHub({'a.pdf': 's1', 'b.txt': 's2', 'c.png': 's3'})
+
+    assert initialize_rag(client, str(manifest), github) == 'stores/1'
+
+    # a.pdf 已在 store 裡不重傳；c.png 不是支援的格式
+    assert client.uploads == ['b.txt']
+    assert read_manifest(str(manifest))['stores/1'] == {
+        'a.pdf': {'sha': 's1', 'document': 'doc/a.pdf-0'},
+        'b.txt': {'sha': 's2', 'document': 'doc/b.txt-1'},
+    }
+
+
+def test_upload_waits_for_operation_before_reading_document_name(tmp_path):
+    client = FakeClient()
+    remote = {'a.pdf': {'sha': 's1', 'download_url': 'dl/a.pdf'}}
+
+    result = sync_store(client, 'stores/1', remote, str(tmp_path / 'm.json'), FakeGitHub({}))
+
+    assert result == {'uploaded': ['a.pdf'], 'deleted': [], 'failed': {}}
+    assert client.polls == 1
+    assert read_manifest(str(tmp_path / 'm.json'))['stores/1']['a.pdf']['document'] == 'doc/a.pdf-1'
+
+
+def test_changed_and_removed_files_replace_old_documents(tmp_path):
+    manifest = str(tmp_path / 'manifest.json')
+    client = FakeClient()
+    github = FakeGitHub({'a.pdf': 's1', 'b.txt': 's2'})
+    initialize_rag(client, manifest, github)
+
+    # 沒有變動時不上傳
+    initialize_rag(client, manifest, github)
+    assert sorted(client.uploads) == ['a.pdf', 'b.txt']
+
+    github.files = {'a.pdf': 's1b'}
+    initialize_rag(client, manifest, github)
+
+    old_a = next(d for d in client.deleted if d.startswith('doc/a.pdf'))
+    assert old_a != read_manifest(manifest)['stores/1']['a.pdf']['document']
+    assert any(d.startswith('doc/b.txt') for d in client.deleted)
+    # store 內只剩最新的一份
+    assert sorted(client.documents.values()) == ['a.pdf']
+
+
+def test_failed_upload_keeps_previous_version(tmp_path):
+    manifest = str(tmp_path / 'manifest.json')
+    client = FakeClient()
+    initialize_rag(client, manifest, FakeGitHub({'a.pdf': 's1'}))
+    before = read_manifest(manifest)['stores/1']['a.pdf']
+
+    def broken(url):
+        if url == rag.GITHUB_API_URL:
+            return Response(payload=[{'name': 'a.pdf', 'sha': 's2', 'download_url': 'dl/a.pdf'}])
+        return Response(status_code=404, content=b'')
+
+    result = sync_store(client, 'stores/1', rag.list_remote_docs(broken), manifest, broken)
+
+    assert list(result['failed']) == ['a.pdf']
+    assert client.deleted == []
+    assert read_manifest(manifest)['stores/1']['a.pdf'] == before
+
+
+def test_store_listing_errors_are_not_swallowed(tmp_path):
+    client = FakeClient()
+
+    def unavailable(parent):
+        raise RuntimeError('store unavailable')
+
+    client.file_search_stores.documents.list = unavailable
+    with pytest.raises(RuntimeError):
+        sync_store(client, 'stores/1', {'a.pdf': {'sha': 's1', 'download_url': 'dl/a.pdf'}},
+                   str(tmp_path / 'm.json'), FakeGitHub({}))
+    assert client.uploads == []
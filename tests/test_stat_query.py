@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from shared.stat_query import StatQuery
+
+
+@pytest.fixture
+def query():
+    bat = pd.DataFrame({
+        'Name': ['陳傑憲', '陳傑憲', '林立', '林安可', '陳晨威'],
+        'Year': [2024, 2025, 2024, 2024, 2025],
+        'Team': ['統一7-ELEVEn獅', '統一7-ELEVEn獅', '樂天桃猿', '統一7-ELEVEn獅', '樂天桃猿'],
+        'PA': [500, 400, 372, 480, 450],
+        'AVG': [0.300, 0.320, 0.353, 0.280, 0.290],
+        'OPS': [0.837, 0.810, 0.852, 0.900, 0.700],
+        'HR': [10, 0, 5, 20, 0],
+        'SO': [50, 40, 60, 90, 70],
+    })
+    pit = pd.DataFrame({
+        'Name': ['銳歐', '王志煊'],
+        'Year': [2024, 2024],
+        'Team': ['味全龍', '樂天桃猿'],
+        'IP': [150.0, 60.0],
+        'ERA': [1.17, 1.50],
+        'SO': [120, 50],
+    })
+    return StatQuery(bat, pit)
+
+
+def test_plain_player_lookup(query):
+    assert '0.837' in query.answer('陳傑憲 2024 OPS')
+    assert '0.837' in query.answer('陳傑憲2024年的OPS是多少？')
+
+
+@pytest.mark.parametrize('text', [
+    '為什麼陳傑憲的打擊率這幾年下降了？可以分析原因嗎',
+    '請比較林立和陳傑憲的全壘打',
+    '陳傑憲 打擊率 全壘打',
+    '陳傑憲 2024 OPS 跟去年比起來進步很多耶',
+    '陳傑憲這季表現如何',
+])
+def test_questions_that_are_not_plain_lookups_go_to_llm(query, text):
+    assert query.answer(text) is None
+
+
+def test_missing_data_goes_to_llm(query):
+    assert query.answer('陳傑憲 2030 OPS') is None
+    # 當季全壘打皆為 0：沒有可排的資料
+    assert query.answer('2025 最多全壘打') is None
+
+
+def test_leaders(query):
+    answer = query.answer('2024 最多全壘打')
+    assert answer.index('林安可') < answer.index('陳傑憲') < answer.index('林立')
+
+
+def test_current_year_follows_the_stat_table(query):
+    assert query.latest_year == {'bat': 2025, 'pit': 2024}
+    # 投手表最新只到 2024
+    answer = query.answer('今年防禦率最低的投手是誰?')
+    assert answer.startswith('**2024 年防禦率排行**')
+    assert answer.index('銳歐') < answer.index('王志煊')
+    assert '2025' in query.answer('陳傑憲 今年 打擊率')